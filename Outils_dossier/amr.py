@@ -0,0 +1,287 @@
+import time
+import numpy as np
+from scipy import ndimage
+from Outils_dossier.solveurs import resoudre
+from Outils_dossier.interpolation import EchantillonneurChamp
+
+
+# ===============================
+# Paramètres du raffinement
+# ===============================
+facteur = 4          # Une case grossière = facteur x facteur cases fines
+taille_bloc = 8      # Les zones raffinées sont des unions de blocs de 8 x 8 cases
+marge = 2            # Cases raffinées autour des dynodes
+quantile_gradient = 0.98  # |E| au-dessus de ce quantile (cases libres) : raffiné
+recouvrement = 4     # Cases communes aux deux niveaux le long du bord d'un rectangle
+max_cycles = 30
+
+
+# ===============================
+# Zones à raffiner
+# ===============================
+def marquer(geometrie, V):
+    # Cases proches des arêtes d'une dynode (les parois du tube sont planes et
+    # ne sont pas raffinées) ou de fort gradient dans la solution grossière
+    dynodes = geometrie.fixe.copy()
+    dynodes[0, :] = dynodes[-1, :] = dynodes[:, 0] = dynodes[:, -1] = False
+    drapeaux = ndimage.binary_dilation(dynodes, iterations=marge)
+
+    Ey, Ex = np.gradient(-V)
+    norme = np.hypot(Ex, Ey)
+    libre = ~geometrie.fixe
+    if libre.any():
+        drapeaux |= libre & (norme > np.quantile(norme[libre], quantile_gradient))
+    return drapeaux
+
+
+def blocs(drapeaux):
+    # Regroupe les blocs marqués en rectangles disjoints, séparés d'au moins
+    # une case ; un rectangle est (j0, j1, i0, i1) en indices de nœuds
+    # grossiers, bords inclus. Les blocs regroupent des cases : la dernière
+    # ligne et la dernière colonne de nœuds (parois du tube) n'en ouvrent pas
+    Ny, Nx = drapeaux.shape
+    nb_j, nb_i = -(-(Ny - 1) // taille_bloc), -(-(Nx - 1) // taille_bloc)
+    tuiles = np.zeros((nb_j * taille_bloc, nb_i * taille_bloc), dtype=bool)
+    tuiles[:Ny - 1, :Nx - 1] = drapeaux[:-1, :-1]
+    tuiles = tuiles.reshape(nb_j, taille_bloc, nb_i, taille_bloc).any(axis=(1, 3))
+
+    etiquettes, _ = ndimage.label(tuiles, structure=np.ones((3, 3)))
+    boites = [[s[0].start, s[0].stop, s[1].start, s[1].stop]
+              for s in ndimage.find_objects(etiquettes)]
+
+    # Fusion des boîtes qui se chevauchent ou se touchent
+    fusion = True
+    while fusion:
+        fusion = False
+        for p in range(len(boites)):
+            for q in range(p + 1, len(boites)):
+                A, B = boites[p], boites[q]
+                if A[0] <= B[1] and B[0] <= A[1] and A[2] <= B[3] and B[2] <= A[3]:
+                    boites[p] = [min(A[0], B[0]), max(A[1], B[1]),
+                                 min(A[2], B[2]), max(A[3], B[3])]
+                    del boites[q]
+                    fusion = True
+                    break
+            if fusion:
+                break
+
+    return [(j0 * taille_bloc, min(j1 * taille_bloc, Ny - 1),
+             i0 * taille_bloc, min(i1 * taille_bloc, Nx - 1)) for j0, j1, i0, i1 in boites]
+
+
+# ===============================
+# Grille fine d'un rectangle
+# ===============================
+def grille_fine(geometrie, boite, r=facteur):
+    # Nœuds fins du rectangle : le nœud fin (J, I) est au point grossier
+    # (j0 + J / r, i0 + I / r). Une dynode occupe, en unités grossières, le
+    # rectangle plein [x, x + c - 1] x [y, y + e - 1] de ses cases grossières ;
+    # les nœuds fins qui y tombent sont fixés à sa tension. Le bord du
+    # rectangle est fixé lui aussi (valeurs interpolées de la grille grossière).
+    j0, j1, i0, i1 = boite
+    ny, nx = r * (j1 - j0) + 1, r * (i1 - i0) + 1
+    fixe = np.zeros((ny, nx), dtype=bool)
+    valeurs = np.zeros((ny, nx))
+    J = np.arange(ny) + r * j0
+    I = np.arange(nx) + r * i0
+    for k, dyn in enumerate(geometrie.dynodes):
+        lignes = (J >= r * dyn['y']) & (J <= r * (dyn['y'] + dyn['e'] - 1))
+        colonnes = (I >= r * dyn['x']) & (I <= r * (dyn['x'] + dyn['c'] - 1))
+        zone = np.ix_(lignes, colonnes)
+        fixe[zone] = True
+        valeurs[zone] = geometrie.tension * (k + 1)
+    bord = np.zeros((ny, nx), dtype=bool)
+    bord[0, :] = bord[-1, :] = bord[:, 0] = bord[:, -1] = True
+    return {'boite': boite, 'fixe': fixe, 'valeurs': valeurs, 'bord': bord & ~fixe}
+
+
+def interpoler(V, boite, shape, r=facteur):
+    # Potentiel grossier aux nœuds fins du rectangle (bilinéaire)
+    j0, _, i0, _ = boite
+    yy, xx = np.meshgrid(j0 + np.arange(shape[0]) / r, i0 + np.arange(shape[1]) / r,
+                         indexing="ij")
+    return ndimage.map_coordinates(V, [yy, xx], order=1, mode="nearest")
+
+
+# ===============================
+# Relaxation sur la grille composite
+# ===============================
+def resoudre_amr(geometrie, r=facteur, tol=1e-3, methode="creux_lu", max_iter=10000):
+    # Schwarz alterné à deux niveaux :
+    #  1. relaxation grossière ;
+    #  2. sur chaque rectangle fin, relaxation avec pour bord le potentiel
+    #     grossier interpolé ;
+    #  3. le potentiel fin est réinjecté aux nœuds grossiers intérieurs des
+    #     rectangles, qui sont tenus fixes pendant la relaxation grossière
+    #     suivante ;
+    # jusqu'à ce que le potentiel grossier sur les rectangles ne bouge plus de
+    # plus de tol. Les masques ne changent pas d'un cycle à l'autre : avec
+    # "creux_lu", chaque niveau n'est factorisé qu'une fois et les cycles
+    # suivants ne coûtent que des résolutions triangulaires.
+    t0 = time.perf_counter()
+    shape = geometrie.shape
+    V = resoudre(geometrie.init_conditions(np.zeros(shape)), geometrie.init_conditions,
+                 tol, max_iter, methode)
+    patches = [grille_fine(geometrie, boite, r) for boite in blocs(marquer(geometrie, V))]
+
+    # Nœuds grossiers à au moins `recouvrement` cases du bord d'un rectangle :
+    # c'est le rectangle fin qui y fixe le potentiel
+    fixe_composite = geometrie.fixe.copy()
+    for p in patches:
+        j0, j1, i0, i1 = p['boite']
+        fixe_composite[j0 + recouvrement:j1 - recouvrement + 1,
+                       i0 + recouvrement:i1 - recouvrement + 1] = True
+    valeurs_composite = geometrie.valeurs.copy()
+
+    def init_composite(W):
+        np.copyto(W, valeurs_composite, where=fixe_composite)
+        return W
+
+    ecart = np.inf
+    cycles = 0
+    while ecart > tol and cycles < max_cycles:
+        for p in patches:
+            W = interpoler(V, p['boite'], p['fixe'].shape, r)
+            if 'V' in p:
+                W[~p['bord']] = p['V'][~p['bord']]  # Démarrage à chaud
+            tenu = p['fixe'] | p['bord']
+            valeurs = np.where(p['fixe'], p['valeurs'], W)
+
+            def init_patch(U, tenu=tenu, valeurs=valeurs):
+                np.copyto(U, valeurs, where=tenu)
+                return U
+
+            p['V'] = resoudre(W, init_patch, tol, max_iter, methode)
+            j0, j1, i0, i1 = p['boite']
+            valeurs_composite[j0:j1 + 1, i0:i1 + 1] = p['V'][::r, ::r]
+            valeurs_composite[geometrie.fixe] = geometrie.valeurs[geometrie.fixe]
+
+        V_ancien = V.copy()
+        V = resoudre(V, init_composite, tol, max_iter, methode)
+        ecart = max((np.max(np.abs(V[j0:j1 + 1, i0:i1 + 1] - V_ancien[j0:j1 + 1, i0:i1 + 1]))
+                     for j0, j1, i0, i1 in (p['boite'] for p in patches)), default=0.0)
+        cycles += 1
+
+    # Champ (V/mm) : pas 1/scale sur la grille grossière, 1/(r scale) sur les fines
+    h = 1 / geometrie.scale
+    Ey, Ex = np.gradient(-V, h, h)
+    for p in patches:
+        p['Ey'], p['Ex'] = np.gradient(-p['V'], h / r, h / r)
+
+    nb_fins = sum(p['V'].size for p in patches)
+    print(f"AMR : {len(patches)} rectangles, {nb_fins} nœuds fins + {V.size} grossiers "
+          f"({nb_fins / (V.size * r * r):.1%} de la grille fine uniforme), "
+          f"{cycles} cycles, {time.perf_counter() - t0:.2f} s")
+    return {'V': V, 'Ex': Ex, 'Ey': Ey, 'patches': patches, 'facteur': r,
+            'scale': geometrie.scale, 'cycles': cycles}
+
+
+# ===============================
+# Échantillonneur composite (même interface qu'EchantillonneurChamp)
+# ===============================
+class EchantillonneurAMR:
+    # Positions en pixels grossiers, comme pour EchantillonneurChamp : les
+    # traceurs des questions 3 l'utilisent sans modification. Dans un
+    # rectangle raffiné, le champ est lu sur la grille fine.
+
+    def __init__(self, amr):
+        self.r = amr['facteur']
+        self.grossier = EchantillonneurChamp(amr['Ex'], amr['Ey'])
+        self.Ny, self.Nx = self.grossier.Ny, self.grossier.Nx
+        self.fins = [EchantillonneurChamp(p['Ex'], p['Ey']) for p in amr['patches']]
+        self.origines = np.array([(p['boite'][2], p['boite'][0]) for p in amr['patches']],
+                                 dtype=float).reshape(-1, 2)
+        # Case grossière -> numéro du rectangle qui la couvre (-1 : aucun). La
+        # case (j, i) va de (j, i) à (j + 1, i + 1) : les lignes j1 et colonnes
+        # i1 sont hors de la grille fine, qui s'arrête au nœud (j1, i1)
+        self.indice = -np.ones((self.Ny, self.Nx), dtype=np.intp)
+        for n, p in enumerate(amr['patches']):
+            j0, j1, i0, i1 = p['boite']
+            self.indice[j0:j1, i0:i1] = n
+        self.nb_appels = 0
+
+    def _rectangle(self, x, y):
+        i = np.clip(np.floor(x).astype(np.intp), 0, self.Nx - 1)
+        j = np.clip(np.floor(y).astype(np.intp), 0, self.Ny - 1)
+        return self.indice[j, i]
+
+    def __call__(self, x, y):
+        self.nb_appels += 1
+        if np.ndim(x) == 0 and np.ndim(y) == 0:
+            return self.scalaire(float(x), float(y))
+        return self.lot(np.asarray(x, dtype=float), np.asarray(y, dtype=float))
+
+    def scalaire(self, x, y):
+        if not (0.0 <= x <= self.Nx - 1 and 0.0 <= y <= self.Ny - 1):
+            return 0.0, 0.0
+        n = int(self._rectangle(x, y))
+        if n < 0:
+            return self.grossier.scalaire(x, y)
+        x0, y0 = self.origines[n]
+        return self.fins[n].scalaire((x - x0) * self.r, (y - y0) * self.r)
+
+    def lot(self, x, y):
+        ex, ey = self.grossier.lot(x, y)
+        n = self._rectangle(x, y)
+        for k in np.unique(n[n >= 0]):
+            sel = n == k
+            x0, y0 = self.origines[k]
+            ex[sel], ey[sel] = self.fins[k].lot((x[sel] - x0) * self.r, (y[sel] - y0) * self.r)
+        return ex, ey
+
+
+# ===============================
+# Comparaison avec la grille fine uniforme
+# ===============================
+def comparer(geometrie, r=facteur, tol=1e-3, methode="creux_lu", methode_reference="multigrille"):
+    # Référence : toute la grille raffinée r fois, même géométrie ; erreur
+    # sur |E| aux nœuds fins proches des dynodes (à moins de 1 mm)
+    t0 = time.perf_counter()
+    Ny, Nx = geometrie.shape
+    uniforme = grille_fine(geometrie, (0, Ny - 1, 0, Nx - 1), r)
+    tenu = uniforme['fixe'] | uniforme['bord']
+
+    def init_uniforme(U):
+        np.copyto(U, uniforme['valeurs'], where=tenu)
+        return U
+
+    V_ref = resoudre(init_uniforme(np.zeros(tenu.shape)), init_uniforme, tol / r ** 2, 100000,
+                     methode_reference)
+    h = 1 / (geometrie.scale * r)
+    Ey_ref, Ex_ref = np.gradient(-V_ref, h, h)
+    temps_ref = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    amr = resoudre_amr(geometrie, r, tol, methode)
+    temps_amr = time.perf_counter() - t0
+
+    yy, xx = np.mgrid[0:Ny - 1:1j * tenu.shape[0], 0:Nx - 1:1j * tenu.shape[1]]
+    proche = ndimage.distance_transform_edt(~uniforme['fixe']) * h < 1.0
+    proche &= ~tenu
+    x, y = xx[proche], yy[proche]
+    E_ref = np.hypot(Ex_ref[proche], Ey_ref[proche])
+    V = geometrie.init_conditions(np.zeros(geometrie.shape))
+    Ey, Ex = np.gradient(-resoudre(V, geometrie.init_conditions, tol, 100000, methode),
+                         1 / geometrie.scale, 1 / geometrie.scale)
+    grossier = EchantillonneurChamp(Ex, Ey)
+    resultats = {}
+    for nom, champ in (("grossier", grossier), ("amr", EchantillonneurAMR(amr))):
+        ex, ey = champ.lot(x, y)
+        resultats[nom] = float(np.median(np.abs(np.hypot(ex, ey) - E_ref) / np.maximum(E_ref, 1e-9)))
+    resultats.update({'temps_reference': temps_ref, 'temps_amr': temps_amr,
+                      'noeuds_reference': V_ref.size,
+                      'noeuds_amr': amr['V'].size + sum(p['V'].size for p in amr['patches'])})
+    return resultats
+
+
+def main():
+    from Outils_dossier.geometrie import tube
+    res = comparer(tube(4))
+    print(f"Erreur relative médiane sur |E| à moins de 1 mm des dynodes : "
+          f"grossier {res['grossier']:.2%}, AMR {res['amr']:.2%}")
+    print(f"Grille fine uniforme : {res['noeuds_reference']} nœuds, {res['temps_reference']:.2f} s ; "
+          f"AMR : {res['noeuds_amr']} nœuds, {res['temps_amr']:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
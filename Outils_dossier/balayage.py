@@ -0,0 +1,198 @@
+import itertools
+import json
+import multiprocessing
+import os
+import time
+import numpy as np
+from Outils_dossier import optimisation
+from Outils_dossier.solveurs import derniere_resolution, resoudre
+from Outils_dossier.jit import trajectoire_euler
+
+# ===============================
+# Paramètres balayables et valeurs par défaut
+# ===============================
+# Géométrie de Q1_pour3c (a..f en mm), tension par étage, réglage du
+# solveur et position de départ de l'électron (départ centré comme Q3_c)
+defauts = {
+    'scale': 10,
+    'N': 4,
+    'tension': 100.0,
+    'tol': 1e-3,
+    'methode': "sor",
+    **{f"{nom}_mm": v for nom, v in zip(optimisation.noms, optimisation.reference)},
+    'x0_mm': 0.0,
+    'y0_mm': optimisation.reference[-1] / 2,
+}
+# Les paramètres qui ne changent pas le potentiel : un même calcul de champ
+# sert à toutes les positions de départ d'une géométrie
+departs = ('x0_mm', 'y0_mm')
+
+resultats = ('iterations', 'temps_resolution', 'temps_trace', 'dynodes_touchees',
+             'transit', 'x_final_mm', 'y_final_mm')
+
+# Intégration (comme optimisation / Q3_c)
+e_charge = optimisation.e_charge
+m = optimisation.m
+dt = optimisation.dt
+duree_totale = optimisation.duree_totale
+rebond_mm = optimisation.rebond_mm
+max_iter = 100000
+
+
+# ===============================
+# Grille de paramètres
+# ===============================
+def grille(**valeurs):
+    # Produit cartésien : chaque paramètre reçoit une valeur ou une liste de
+    # valeurs ; les autres gardent leur valeur par défaut
+    inconnus = set(valeurs) - set(defauts)
+    if inconnus:
+        raise ValueError(f"Paramètres inconnus : {', '.join(sorted(inconnus))} "
+                         f"(disponibles : {', '.join(defauts)})")
+    listes = {nom: valeurs.get(nom, defauts[nom]) for nom in defauts}
+    listes = {nom: np.asarray(v).tolist() if isinstance(v, (list, tuple, np.ndarray)) else [v]
+              for nom, v in listes.items()}
+    return [dict(zip(listes, combinaison)) for combinaison in itertools.product(*listes.values())]
+
+
+def cle(job):
+    # Identifiant stable d'un point de la grille (reprise après interruption)
+    return json.dumps({nom: job[nom] for nom in defauts}, sort_keys=True, default=float)
+
+
+# ===============================
+# Exécution d'une géométrie : résolution -> champ -> tracés
+# ===============================
+def executer_geometrie(parametres, positions_depart):
+    p = parametres
+    init_conditions, shape, dynodes = optimisation.geometrie(
+        *(p[f"{nom}_mm"] for nom in optimisation.noms),
+        N=p['N'], scale=p['scale'], tension=p['tension'])
+
+    t0 = time.perf_counter()
+    V = resoudre(init_conditions(np.zeros(shape)), init_conditions, p['tol'], max_iter,
+                 p['methode'])
+    Ey, Ex = np.gradient(-V, 1 / p['scale'], 1 / p['scale'])
+    temps_resolution = time.perf_counter() - t0
+    iterations = derniere_resolution.get('iterations', -1)
+
+    k_acc = (e_charge / m) * p['scale'] * 1e3
+    nb_steps = int(duree_totale / dt)
+    lignes = []
+    for x0_mm, y0_mm in positions_depart:
+        t0 = time.perf_counter()
+        positions, touchees, instants = trajectoire_euler(
+            Ex, Ey, x0_mm * p['scale'], y0_mm * p['scale'], 0.0, 0.0, dt, nb_steps, k_acc,
+            dynodes=dynodes, rebond_pixels=rebond_mm * p['scale'], details=True)
+        # Temps de transit : impact sur la dernière dynode (NaN si non atteinte)
+        lignes.append({**p, 'x0_mm': x0_mm, 'y0_mm': y0_mm,
+                       'iterations': iterations,
+                       'temps_resolution': temps_resolution,
+                       'temps_trace': time.perf_counter() - t0,
+                       'dynodes_touchees': int(touchees),
+                       'transit': float(instants[-1]) if len(instants) else np.nan,
+                       'x_final_mm': float(positions[-1, 0] / p['scale']),
+                       'y_final_mm': float(positions[-1, 1] / p['scale'])})
+    return lignes
+
+
+def _executer(tache):
+    return executer_geometrie(*tache)
+
+
+# ===============================
+# Stockage : journal (reprise) + fichier colonnes
+# ===============================
+# <sortie>.jsonl reçoit une ligne par point terminé, écrite dès la fin de sa
+# géométrie ; <sortie>.npz contient les mêmes lignes rangées par colonnes
+def lire_journal(sortie):
+    chemin = sortie + ".jsonl"
+    if not os.path.exists(chemin):
+        return []
+    lignes = []
+    with open(chemin) as fichier:
+        for ligne in fichier:
+            try:
+                lignes.append(json.loads(ligne))
+            except json.JSONDecodeError:
+                break  # Dernière ligne tronquée par une interruption
+    return lignes
+
+
+def ajouter_journal(sortie, lignes):
+    with open(sortie + ".jsonl", "a") as fichier:
+        for ligne in lignes:
+            fichier.write(json.dumps(ligne, default=float) + "\n")
+        fichier.flush()
+        os.fsync(fichier.fileno())
+
+
+def ecrire_colonnes(sortie, lignes):
+    colonnes = {nom: np.array([ligne[nom] for ligne in lignes])
+                for nom in (*defauts, *resultats)}
+    tmp = f"{sortie}.{os.getpid()}.tmp.npz"
+    np.savez(tmp, **colonnes)
+    os.replace(tmp, sortie + ".npz")
+    return colonnes
+
+
+def charger(sortie):
+    with np.load(sortie + ".npz") as donnees:
+        return {nom: donnees[nom] for nom in donnees.files}
+
+
+# ===============================
+# Balayage
+# ===============================
+def balayer(jobs, sortie="balayage", nb_processus=1):
+    # Les points déjà présents dans le journal ne sont pas recalculés ; les
+    # autres sont regroupés par géométrie (un seul calcul du potentiel par
+    # groupe) et répartis sur nb_processus processus
+    faites = lire_journal(sortie)
+    deja = {cle(ligne) for ligne in faites}
+    restants = [job for job in jobs if cle(job) not in deja]
+
+    groupes = {}
+    for job in restants:
+        geometrie_job = {nom: v for nom, v in job.items() if nom not in departs}
+        groupe = groupes.setdefault(cle({**geometrie_job, 'x0_mm': 0, 'y0_mm': 0}),
+                                    (geometrie_job, []))
+        groupe[1].append(tuple(job[nom] for nom in departs))
+    taches = list(groupes.values())
+
+    print(f"Balayage : {len(jobs)} points, {len(jobs) - len(restants)} déjà faits, "
+          f"{len(taches)} géométries à résoudre")
+    t0 = time.perf_counter()
+
+    def enregistrer(lignes):
+        ajouter_journal(sortie, lignes)
+        faites.extend(lignes)
+        print(f"  {len(faites)}/{len(jobs)} points ({time.perf_counter() - t0:.1f} s)")
+
+    if nb_processus > 1:
+        with multiprocessing.Pool(nb_processus) as pool:
+            for lignes in pool.imap_unordered(_executer, taches):
+                enregistrer(lignes)
+    else:
+        for tache in taches:
+            enregistrer(_executer(tache))
+
+    # Seuls les points de cette grille vont dans le fichier colonnes
+    demandes = {cle(job) for job in jobs}
+    return ecrire_colonnes(sortie, [ligne for ligne in faites if cle(ligne) in demandes])
+
+
+def main():
+    jobs = grille(scale=[5, 10], tension=[80.0, 100.0, 120.0],
+                  y0_mm=[4.5, 5.43, 6.5])
+    colonnes = balayer(jobs, nb_processus=os.cpu_count() or 1)
+    for k in range(len(colonnes['scale'])):
+        print(f"scale = {colonnes['scale'][k]:2d}, tension = {colonnes['tension'][k]:5.1f} V, "
+              f"y0 = {colonnes['y0_mm'][k]:.2f} mm : "
+              f"{colonnes['dynodes_touchees'][k]}/{colonnes['N'][k]} dynodes, "
+              f"transit = {colonnes['transit'][k]:.2e} s, "
+              f"{colonnes['iterations'][k]} itérations")
+
+
+if __name__ == "__main__":
+    main()
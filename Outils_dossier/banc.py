@@ -0,0 +1,232 @@
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+from Outils_dossier.solveurs import derniere_resolution
+from Outils_dossier.geometrie import Geometrie, tube
+from Outils_dossier.interpolation import EchantillonneurChamp
+from Outils_dossier.electrodes import IndexElectrodes
+from Outils_dossier.jit import trajectoire_euler
+from Outils_dossier.traceur import tracer_lot
+
+# ===============================
+# Paramètres du banc d'essai
+# ===============================
+# Géométries : tube de Q1 (4 dynodes) et tube de Q3_d (12 dynodes), chacune
+# reconstruite à chaque échelle. La référence est la résolution directe
+# (creux_lu) du même problème discret ; "jacobi" est la relaxation de la
+# chaîne de production (Geometrie.relaxation par défaut).
+geometries = {
+    'N4': lambda scale: Geometrie(scale=scale),
+    'N12': lambda scale: tube(12, scale=scale),
+}
+methode_reference = "creux_lu"
+tol = 1e-3
+max_iter = 100000
+
+# Tracé comme Q3_c / Q3_d
+e_charge = -1.602e-19
+m = 9.109e-31
+dt = 3e-11
+durees = {4: 1.7e-7, 12: 3.15e-7}
+rebond_mm = 2.0
+nb_electrons = 256  # Trajectoires par lot
+
+# Seuils de régression (nouveau / ancien)
+seuil_temps = 1.25
+seuil_erreur = 2.0
+
+racine = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# ===============================
+# Mesures
+# ===============================
+def chronometrer(fonction, repetitions=1):
+    # Renvoie (dernier résultat, meilleur temps, temps médian)
+    temps = []
+    for _ in range(repetitions):
+        t0 = time.perf_counter()
+        resultat = fonction()
+        temps.append(time.perf_counter() - t0)
+    return resultat, min(temps), float(np.median(temps))
+
+
+def mesure(etape, geometrie, scale, methode, temps, **autres):
+    t_min, t_median = temps
+    return {'etape': etape, 'geometrie': geometrie, 'scale': scale, 'methode': methode,
+            'temps': t_min, 'temps_median': t_median, **autres}
+
+
+def parametres_trace(g):
+    k_acc = (e_charge / m) * g.scale * 1e3
+    nb_steps = int(durees.get(g.N, durees[12]) / dt)
+    return k_acc, nb_steps
+
+
+# ===============================
+# Étapes sur une géométrie à une échelle
+# ===============================
+def banc_geometrie(nom, scale, methodes=("jacobi", "sor", "multigrille"), repetitions=3):
+    g = geometries[nom](scale)
+    cases = g.Ny * g.Nx
+    mesures = []
+
+    V_ref = g.relaxation(g.init_conditions(np.zeros(g.shape)), tol, max_iter, methode_reference)
+    Ex_ref, Ey_ref = g.calcul_champ_electrique(V_ref)
+    E_max = np.max(np.hypot(Ex_ref, Ey_ref))
+    k_acc, nb_steps = parametres_trace(g)
+    x0, y0 = 0.0, g.Ny / 2
+
+    def trace(Ex, Ey):
+        return trajectoire_euler(Ex, Ey, x0, y0, 0.0, 0.0, dt, nb_steps, k_acc,
+                                 dynodes=g.dynodes, rebond_pixels=rebond_mm * scale, details=True)
+
+    pos_ref, touchees_ref, _ = trace(Ex_ref, Ey_ref)
+
+    for methode in methodes:
+        V, *temps = chronometrer(lambda: g.relaxation(g.init_conditions(np.zeros(g.shape)), tol,
+                                                      max_iter, methode), repetitions)
+        iterations = derniere_resolution.get('iterations', -1)
+        Ex, Ey = g.calcul_champ_electrique(V)
+        pos, touchees, _ = trace(Ex, Ey)
+        n = min(len(pos), len(pos_ref))
+        mesures.append(mesure(
+            "relaxation", nom, scale, methode, temps, cases=cases, iterations=iterations,
+            balayages_par_s=iterations / temps[0] if temps[0] > 0 else None,
+            erreur_V=float(np.max(np.abs(V - V_ref))),
+            erreur_E=float(np.max(np.hypot(Ex - Ex_ref, Ey - Ey_ref)) / E_max),
+            erreur_trajectoire_mm=float(np.max(np.hypot(*(pos[:n] - pos_ref[:n]).T))) / scale,
+            memes_dynodes=bool(touchees == touchees_ref)))
+
+    _, *temps = chronometrer(lambda: g.calcul_champ_electrique(V_ref), repetitions)
+    mesures.append(mesure("calcul_champ_electrique", nom, scale, "np.gradient", temps,
+                          cases=cases))
+
+    trace(Ex_ref, Ey_ref)  # Compilation Numba éventuelle hors chronomètre
+    (_, touchees, _), *temps = chronometrer(lambda: trace(Ex_ref, Ey_ref), repetitions)
+    mesures.append(mesure("trajectoire", nom, scale, "euler", temps, pas=nb_steps,
+                          pas_par_s=nb_steps / temps[0], dynodes_touchees=int(touchees)))
+
+    champ = EchantillonneurChamp(Ex_ref, Ey_ref)
+    etiquettes = IndexElectrodes(g.init_conditions, g.shape).etiquettes
+    etats = np.zeros((nb_electrons, 4))
+    etats[:, 1] = np.linspace(0.25, 0.75, nb_electrons) * g.Ny
+    resultat, *temps = chronometrer(
+        lambda: tracer_lot(etats, champ, dt, nb_steps, k_acc, etiquettes), repetitions)
+    pas_total = int(np.sum(resultat['pas']))
+    mesures.append(mesure("trajectoires_lot", nom, scale, "euler", temps,
+                          electrons=nb_electrons, pas=pas_total, pas_par_s=pas_total / temps[0]))
+    return mesures
+
+
+# ===============================
+# Chaîne complète sans affichage
+# ===============================
+def banc_pipeline():
+    # equipe-21-main dans un dossier temporaire (figures et cache jetables) :
+    # d'abord à froid, puis avec le cache et les figures déjà là
+    mesures = []
+    with tempfile.TemporaryDirectory() as dossier:
+        os.makedirs(os.path.join(dossier, "figures_dos"))
+        env = {**os.environ, 'MPLBACKEND': "Agg", 'PM_HEADLESS': "1",
+               'PM_CACHE_DIR': os.path.join(dossier, "cache"),
+               'PYTHONPATH': os.pathsep.join(filter(None, [racine, os.environ.get("PYTHONPATH")]))}
+        for etat in ("froid", "chaud"):
+            t0 = time.perf_counter()
+            subprocess.run([sys.executable, os.path.join(racine, "equipe-21-main.py")], cwd=dossier,
+                           env=env, check=True, stdout=subprocess.DEVNULL)
+            duree = time.perf_counter() - t0
+            mesures.append(mesure("equipe-21-main", "pipeline", None, etat, (duree, duree)))
+    return mesures
+
+
+# ===============================
+# Résultats et régressions
+# ===============================
+def environnement():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=racine,
+                                capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {'date': time.strftime("%Y-%m-%d %H:%M:%S"), 'commit': commit,
+            'python': platform.python_version(), 'numpy': np.__version__,
+            'machine': platform.machine(), 'coeurs': os.cpu_count()}
+
+
+def cle(mesure):
+    return (mesure['etape'], mesure['geometrie'], mesure['scale'], mesure['methode'])
+
+
+def regressions(ancien, nouveau):
+    # Mesures plus lentes de plus de seuil_temps, ou moins précises de plus de
+    # seuil_erreur (ou n'atteignant plus les mêmes dynodes), que la référence
+    anciennes = {cle(l): l for l in ancien['mesures']}
+    signalees = []
+    for l in nouveau['mesures']:
+        a = anciennes.get(cle(l))
+        if a is None:
+            continue
+        motifs = []
+        if l['temps'] > seuil_temps * a['temps']:
+            motifs.append(f"temps x{l['temps'] / a['temps']:.2f}")
+        for champ in ('erreur_V', 'erreur_E', 'erreur_trajectoire_mm'):
+            if champ in l and champ in a and l[champ] > seuil_erreur * max(a[champ], 1e-12):
+                motifs.append(f"{champ} {a[champ]:.2e} -> {l[champ]:.2e}")
+        if a.get('memes_dynodes') and not l.get('memes_dynodes', True):
+            motifs.append("dynodes touchées différentes")
+        if motifs:
+            signalees.append({**l, 'motifs': motifs})
+    return signalees
+
+
+def afficher(resultats):
+    print(f"\n=== Banc d'essai ({resultats['environnement']['commit']}) ===")
+    print(f"{'étape':>24s} {'géom.':>8s} {'scale':>5s} {'méthode':>12s} {'temps (s)':>10s}  détails")
+    for l in resultats['mesures']:
+        details = ", ".join(f"{k} = {v:.3g}" if isinstance(v, float) else f"{k} = {v}"
+                            for k, v in l.items()
+                            if k not in ('etape', 'geometrie', 'scale', 'methode', 'temps',
+                                         'temps_median'))
+        print(f"{l['etape']:>24s} {l['geometrie']:>8s} {str(l['scale']):>5s} {l['methode']:>12s} "
+              f"{l['temps']:>10.4g}  {details}")
+
+
+def executer(scales=(10, 20), noms=("N4", "N12"), methodes=("jacobi", "sor", "multigrille"),
+             pipeline=True):
+    mesures = []
+    for nom in noms:
+        for scale in scales:
+            mesures += banc_geometrie(nom, scale, methodes)
+    if pipeline:
+        mesures += banc_pipeline()
+    return {'environnement': environnement(), 'mesures': mesures}
+
+
+def main(sortie="banc.json", reference=None):
+    # python -m Outils_dossier.banc [sortie.json] [reference.json]
+    resultats = executer()
+    afficher(resultats)
+    with open(sortie, "w") as f:
+        json.dump(resultats, f, indent=2)
+    print(f"\nRésultats écrits dans {sortie}")
+
+    if reference is not None:
+        with open(reference) as f:
+            ancien = json.load(f)
+        signalees = regressions(ancien, resultats)
+        print(f"\n=== Régressions par rapport à {reference} "
+              f"({ancien['environnement'].get('commit')}) : {len(signalees)} ===")
+        for l in signalees:
+            print(f"  {l['etape']} {l['geometrie']} scale = {l['scale']} {l['methode']} : "
+                  f"{', '.join(l['motifs'])}")
+        return signalees
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
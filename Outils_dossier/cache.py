@@ -0,0 +1,128 @@
+import hashlib
+import os
+import shutil
+import numpy as np
+from Outils_dossier.solveurs import masque_dirichlet, type_flottant
+from Outils_dossier import telemetrie
+
+
+# ===============================
+# Paramètres du cache disque
+# ===============================
+# PM_CACHE=0 désactive le cache, PM_CACHE_DIR change son dossier
+actif = os.environ.get("PM_CACHE", "1") != "0"
+dossier = os.environ.get(
+    "PM_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache_champs"))
+taille_max = 512 * 1024 ** 2  # Octets ; au-delà, on efface les entrées les moins récemment lues
+
+
+# ===============================
+# Clé de contenu
+# ===============================
+def cle_geometrie(init_conditions, shape, scale, tol, methode, precision="float64"):
+    # La géométrie (a..f, N), l'échelle et les tensions sont entièrement
+    # décrites par le masque et les valeurs imposées par init_conditions.
+    # La précision n'entre dans la clé que hors float64 (clés existantes inchangées)
+    fixe = masque_dirichlet(init_conditions, shape)
+    valeurs = init_conditions(np.zeros(shape))[fixe]
+    h = hashlib.sha1()
+    h.update(repr((shape, scale, tol, methode)).encode())
+    if precision != "float64":
+        h.update(precision.encode())
+    h.update(np.packbits(fixe).tobytes())
+    h.update(np.ascontiguousarray(valeurs, dtype=np.float64).tobytes())
+    return h.hexdigest()
+
+
+# ===============================
+# Lecture / écriture
+# ===============================
+def _chemin(cle):
+    return os.path.join(dossier, cle)
+
+
+def lire(cle, noms):
+    chemin = _chemin(cle)
+    fichiers = [os.path.join(chemin, nom + ".npy") for nom in noms]
+    if not all(os.path.exists(fichier) for fichier in fichiers):
+        return None
+    os.utime(chemin)  # Marque l'entrée comme récemment utilisée (LRU)
+    return [np.load(fichier, mmap_mode="r") for fichier in fichiers]
+
+
+def ecrire(cle, tableaux):
+    chemin = _chemin(cle)
+    os.makedirs(chemin, exist_ok=True)
+    for nom, tableau in tableaux.items():
+        # Écriture dans un fichier temporaire puis renommage : un autre
+        # processus ne lit jamais un tableau à moitié écrit
+        tmp = os.path.join(chemin, f".{nom}.{os.getpid()}.npy")
+        np.save(tmp, tableau)
+        os.replace(tmp, os.path.join(chemin, nom + ".npy"))
+    os.utime(chemin)
+    evincer()
+
+
+def taille_entree(chemin):
+    return sum(os.path.getsize(os.path.join(chemin, f)) for f in os.listdir(chemin))
+
+
+def evincer():
+    if not os.path.isdir(dossier):
+        return
+    entrees = [os.path.join(dossier, nom) for nom in os.listdir(dossier)]
+    entrees = sorted((e for e in entrees if os.path.isdir(e)), key=os.path.getmtime)
+    tailles = {e: taille_entree(e) for e in entrees}
+    total = sum(tailles.values())
+    for entree in entrees[:-1]:  # On garde toujours l'entrée la plus récente
+        if total <= taille_max:
+            break
+        shutil.rmtree(entree, ignore_errors=True)
+        total -= tailles[entree]
+
+
+def vider():
+    shutil.rmtree(dossier, ignore_errors=True)
+
+
+# ===============================
+# Potentiel et champ avec cache
+# ===============================
+def champs_en_cache(init_conditions, relaxation, shape, scale,
+                    calcul_champ_electrique=None, tol=1e-3, methode="jacobi",
+                    V_initial=None, noms_champ=("Ex", "Ey"), precision="float64"):
+    # Renvoie V (et Ex, Ey si calcul_champ_electrique est fourni) ; les
+    # tableaux relus du disque sont projetés en mémoire, en lecture seule.
+    # V_initial : point de départ de la relaxation (démarrage à chaud)
+    # noms_champ : composantes renvoyées par calcul_champ_electrique (3D : Ex, Ey, Ez)
+    # precision : "float64" ou "float32" pour V (et donc pour le champ)
+    noms = ["V"] if calcul_champ_electrique is None else ["V", *noms_champ]
+    cle = cle_geometrie(init_conditions, shape, scale, tol, methode, precision)
+
+    if actif:
+        resultat = lire(cle, noms)
+        if resultat is not None:
+            telemetrie.compter("lectures_cache")
+            print(f"Potentiel relu du cache ({cle[:12]})")
+            return resultat[0] if len(noms) == 1 else tuple(resultat)
+
+    V = lire(cle, ["V"]) if actif else None
+    if V is None:
+        dtype = type_flottant(precision)
+        V = np.zeros(shape, dtype) if V_initial is None else np.array(V_initial, dtype=dtype)
+        V = init_conditions(V)
+        with telemetrie.etape("relaxation"):
+            V = relaxation(V, tol=tol, methode=methode)
+    else:
+        V = V[0]
+    tableaux = {"V": V}
+    if calcul_champ_electrique is not None:
+        with telemetrie.etape("gradient"):
+            tableaux.update(zip(noms_champ, calcul_champ_electrique(V)))
+
+    if actif:
+        telemetrie.compter("ecritures_cache")
+        ecrire(cle, {nom: t for nom, t in tableaux.items() if not isinstance(t, np.memmap)})
+    resultat = [tableaux[nom] for nom in noms]
+    return resultat[0] if len(noms) == 1 else tuple(resultat)
@@ -0,0 +1,210 @@
+import multiprocessing
+import numpy as np
+from Outils_dossier.fournisseurs import champs, geometrie, Q1_POUR3D
+from Outils_dossier.interpolation import EchantillonneurChamp
+from Outils_dossier.electrodes import IndexElectrodes
+from Outils_dossier.traceur import tracer_lot
+
+# ===============================
+# Constantes physiques et modèle d'émission secondaire
+# ===============================
+e_charge = -1.602e-19  # charge de l'électron (C)
+m = 9.109e-31          # masse de l'électron (kg)
+
+delta_max = 8.0        # Rendement secondaire maximal
+E_max = 500.0          # Énergie d'impact du maximum (eV)
+E_emission = 2.0       # Énergie moyenne d'émission des secondaires (eV)
+# Chaque dynode plane est un maximum local du potentiel (parois à 0 V) : un
+# secondaire de quelques eV émis au contact retombe sur sa dynode, sauf près
+# de son extrémité aval. Comme le rebond des questions 3c/3d (déplacement de
+# 2 mm, vy annulée, vx conservée), le secondaire part à rebond_mm de la surface
+# avec la vitesse tangentielle de l'électron incident, qui l'emmène vers la
+# dynode suivante.
+rebond_mm = 2.0        # Décalage du point d'émission le long de la normale
+tangentielle = 1.0     # Fraction de la vitesse tangentielle incidente conservée
+
+# Paramètres de simulation (mêmes unités que les questions 3)
+dt = 3e-11
+nb_steps_max = 20000    # Garde-fou par génération
+max_particules = 100000  # Au-delà, la population est rééchantillonnée (poids)
+
+# Stockage compact : une ligne par électron
+PARTICULE = np.dtype([
+    ('x', 'f8'), ('y', 'f8'), ('vx', 'f8'), ('vy', 'f8'),
+    ('poids', 'f8'),        # nombre d'électrons réels représentés
+    ('V_depart', 'f8'),     # potentiel du point d'émission (V)
+    ('E_depart', 'f8'),     # énergie cinétique à l'émission (eV)
+    ('origine', 'i8'),      # dynode émettrice (0 : photoélectron)
+])
+
+
+def vitesse(E, scale):
+    # Vitesse (unités du traceur) d'un électron d'énergie cinétique E (eV).
+    # Le traceur accélère de k_acc = (q/m) * scale * 1e3 par V/mm : traverser
+    # une différence de potentiel U donne v² = 2 |q| U / m * scale² * 1e3, et
+    # c'est cette même relation qui relie E à v
+    return np.sqrt(2 * E * abs(e_charge) / m * 1e3) * scale
+
+
+def rendement(E):
+    # Loi universelle de Sternglass : maximum delta_max en E = E_max
+    r = np.maximum(E, 0.0) / E_max
+    return delta_max * np.e ** 2 * r * np.exp(-2 * np.sqrt(r))
+
+
+# ===============================
+# Gestion de la population
+# ===============================
+def peigner(pop, cible, rng):
+    # Rééchantillonnage systématique en `cible` particules de même poids :
+    # le poids total (donc le gain moyen) est conservé
+    poids = pop['poids']
+    total = poids.sum()
+    cumul = np.cumsum(poids)
+    dents = (rng.random() + np.arange(cible)) * (total / cible)
+    choisis = pop[np.searchsorted(cumul, dents)].copy()
+    choisis['poids'] = total / cible
+    return choisis
+
+
+def emettre(impacts, dynodes, tensions_impact, normales, distances, scale, rng):
+    # Nombre de secondaires : Poisson de moyenne rendement(énergie d'impact)
+    E_impact = tensions_impact - impacts['V_depart'] + impacts['E_depart']
+    nombres = rng.poisson(rendement(E_impact))
+    parents = np.repeat(np.arange(len(impacts)), nombres)
+    n = len(parents)
+    sec = np.empty(n, dtype=PARTICULE)
+
+    # Émission à rebond_mm de la surface, énergie ~ Gamma(2), angle en cosinus
+    # autour de la normale
+    nx, ny = normales[0][parents], normales[1][parents]
+    recul = max(rebond_mm * scale, 0.75) - distances[parents]
+    sec['x'] = impacts['x'][parents] + recul * nx
+    sec['y'] = impacts['y'][parents] + recul * ny
+    E = rng.gamma(2.0, E_emission / 2, n)
+    theta = np.arcsin(np.sqrt(rng.random(n))) * rng.choice((-1.0, 1.0), n)
+    v = vitesse(E, scale)
+    c, s = np.cos(theta), np.sin(theta)
+    # Vitesse tangentielle de l'électron incident conservée (fraction
+    # `tangentielle`), comme le rebond des questions 3c/3d qui annule vy mais
+    # garde vx
+    vx, vy = impacts['vx'][parents], impacts['vy'][parents]
+    vn = vx * nx + vy * ny
+    sec['vx'] = v * (c * nx - s * ny) + tangentielle * (vx - vn * nx)
+    sec['vy'] = v * (s * nx + c * ny) + tangentielle * (vy - vn * ny)
+    sec['poids'] = impacts['poids'][parents]
+    # L'énergie au prochain impact est comptée depuis la surface émettrice
+    # (le décalage rebond_mm ne fournit pas d'énergie, la vitesse tangentielle
+    # conservée non plus : sinon chaque secondaire recevrait l'énergie de
+    # l'électron incident)
+    sec['V_depart'] = tensions_impact[parents]
+    sec['E_depart'] = E
+    sec['origine'] = dynodes[parents]
+    return sec
+
+
+# ===============================
+# Une cascade (un photoélectron)
+# ===============================
+_contexte = {}
+
+
+def contexte(nom):
+    if nom not in _contexte:
+        g = geometrie(nom)
+        V, Ex, Ey = champs(nom)
+        _contexte[nom] = {
+            'g': g,
+            'champ': EchantillonneurChamp(Ex, Ey),
+            'index': IndexElectrodes(g.init_conditions, (g.Ny, g.Nx)),
+        }
+    return _contexte[nom]
+
+
+def cascade(graine, nom=Q1_POUR3D, x0_mm=0.0, y0_mm=None):
+    ctx = contexte(nom)
+    g, champ, index = ctx['g'], ctx['champ'], ctx['index']
+    rng = np.random.default_rng(graine)
+    k_acc = (e_charge / m) * g.scale * 1e3
+    nb_dynodes = len(index.tensions)
+    anode = nb_dynodes  # La dernière dynode collecte
+
+    pop = np.zeros(1, dtype=PARTICULE)
+    pop['x'] = x0_mm * g.scale
+    pop['y'] = (g.f / 2 if y0_mm is None else y0_mm * g.scale)
+    pop['poids'] = 1.0
+
+    # Arrivées sur chaque dynode depuis une dynode précédente (ou la
+    # photocathode) ; les secondaires qui retombent sur leur dynode émettrice
+    # ou une dynode antérieure sont comptés à part
+    collecte = 0.0
+    impacts_par_dynode = np.zeros(nb_dynodes)
+    retours_par_dynode = np.zeros(nb_dynodes)
+    generation = 0
+    while len(pop) and generation <= 2 * nb_dynodes:
+        if len(pop) > max_particules:
+            pop = peigner(pop, max_particules, rng)
+
+        etats = np.column_stack((pop['x'], pop['y'], pop['vx'], pop['vy']))
+        res = tracer_lot(etats, champ, dt, nb_steps_max, k_acc, index.etiquettes)
+        touche = res['fin'] > 0
+        impacts = pop[touche].copy()
+        for k, cle in enumerate(('x', 'y', 'vx', 'vy')):
+            impacts[cle] = res['etats'][touche, k]
+        dynodes = res['fin'][touche]
+        arrivee = dynodes > impacts['origine']
+        np.add.at(impacts_par_dynode, dynodes[arrivee] - 1, impacts['poids'][arrivee])
+        np.add.at(retours_par_dynode, dynodes[~arrivee] - 1, impacts['poids'][~arrivee])
+
+        a_anode = dynodes == anode
+        collecte += impacts['poids'][a_anode].sum()
+        impacts, dynodes = impacts[~a_anode], dynodes[~a_anode]
+
+        _, distances, normales = index.requete(impacts['x'], impacts['y'])
+        pop = emettre(impacts, dynodes, index.tensions[dynodes - 1], normales, distances,
+                      g.scale, rng)
+        generation += 1
+
+    return collecte, impacts_par_dynode, retours_par_dynode
+
+
+# ===============================
+# Gain du PM sur plusieurs photoélectrons
+# ===============================
+def gain(nb_primaires=100, graine=0, nb_processus=1, nom=Q1_POUR3D):
+    # Un flux aléatoire indépendant par photoélectron (SeedSequence.spawn) :
+    # le résultat ne dépend pas du nombre de processus
+    graines = np.random.SeedSequence(graine).spawn(nb_primaires)
+    taches = [(s, nom) for s in graines]
+    if nb_processus > 1:
+        with multiprocessing.Pool(nb_processus) as pool:
+            resultats = pool.starmap(cascade, taches)
+    else:
+        resultats = [cascade(*t) for t in taches]
+
+    gains = np.array([r[0] for r in resultats])
+    impacts = np.array([r[1] for r in resultats])
+    retours = np.array([r[2] for r in resultats])
+    moyenne = gains.mean()
+    variance = gains.var(ddof=1) if len(gains) > 1 else 0.0
+    return {
+        'gains': gains,
+        'gain': moyenne,
+        'variance': variance,
+        'facteur_bruit': 1 + variance / moyenne ** 2 if moyenne > 0 else np.nan,
+        'impacts_par_dynode': impacts.mean(axis=0),
+        'retours_par_dynode': retours.mean(axis=0),
+    }
+
+
+def main():
+    res = gain(nb_primaires=20)
+    print(f"Gain moyen : {res['gain']:.3e} (écart-type {np.sqrt(res['variance']):.3e}, "
+          f"facteur de bruit {res['facteur_bruit']:.2f})")
+    for k, (n, r) in enumerate(zip(res['impacts_par_dynode'], res['retours_par_dynode']),
+                               start=1):
+        print(f"  dynode {k:2d} : {n:.3e} électrons arrivés, {r:.3e} retombés")
+
+
+if __name__ == "__main__":
+    main()
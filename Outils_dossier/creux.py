@@ -0,0 +1,127 @@
+import hashlib
+from collections import OrderedDict
+import numpy as np
+import scipy.sparse as sp
+import scipy.sparse.linalg as spla
+from Outils_dossier.solveurs import masque_dirichlet, noter
+
+
+# ===============================
+# Cache des factorisations par géométrie
+# ===============================
+# Clé : empreinte du masque des cases fixées (forme + position des dynodes).
+# Les tensions n'interviennent que dans le second membre : changer de jeu de
+# tensions sur la même géométrie réutilise la factorisation. Le cache est
+# borné (moins récemment utilisée évincée) : l'optimiseur et les balayages
+# enchaînent les géométries. Une résolution AMR y garde à la fois ses
+# rectangles et ses deux niveaux grossiers (14 systèmes pour le tube à 12
+# dynodes), qu'elle reparcourt à chaque cycle.
+taille_cache = 16
+_systemes = OrderedDict()
+
+
+def empreinte_geometrie(fixe):
+    h = hashlib.sha1(np.packbits(fixe).tobytes())
+    h.update(str(fixe.shape).encode())
+    return h.hexdigest()
+
+
+# ===============================
+# Assemblage du système A u = b (cases libres uniquement)
+# ===============================
+def assembler(fixe):
+    libre = ~fixe
+    indices = -np.ones(fixe.shape, dtype=np.int64)
+    n = int(libre.sum())
+    indices[libre] = np.arange(n)
+
+    lignes = [np.arange(n)]
+    colonnes = [np.arange(n)]
+    valeurs = [np.full(n, 4.0)]
+    jj, ii = np.nonzero(libre)  # les cases libres sont toutes intérieures
+    for dj, di in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+        voisin = indices[jj + dj, ii + di]
+        ok = voisin >= 0
+        lignes.append(indices[jj, ii][ok])
+        colonnes.append(voisin[ok])
+        valeurs.append(-np.ones(ok.sum()))
+
+    A = sp.csc_matrix((np.concatenate(valeurs),
+                       (np.concatenate(lignes), np.concatenate(colonnes))),
+                      shape=(n, n))
+    return A, libre
+
+
+def second_membre(V, fixe, libre):
+    # Contribution des voisins à potentiel imposé (le système est en float64
+    # même si V est en float32)
+    W = np.where(fixe, V, 0.0).astype(np.float64, copy=False)
+    s = np.zeros_like(W)
+    s[1:-1, 1:-1] = W[2:, 1:-1] + W[:-2, 1:-1] + W[1:-1, 2:] + W[1:-1, :-2]
+    return s[libre]
+
+
+def systeme(fixe):
+    cle = empreinte_geometrie(fixe)
+    if cle in _systemes:
+        _systemes.move_to_end(cle)
+    else:
+        A, libre = assembler(fixe)
+        _systemes[cle] = {'A': A, 'libre': libre, 'lu': None, 'ilu': None}
+        while len(_systemes) > taille_cache:
+            _systemes.popitem(last=False)
+    return _systemes[cle]
+
+
+def vider_cache():
+    _systemes.clear()
+
+
+# ===============================
+# Solveurs creux (même interface que relaxation)
+# ===============================
+def relaxation_creux_lu(V, init_conditions, tol=1e-3, max_iter=10000):
+    V = init_conditions(V)
+    fixe = masque_dirichlet(init_conditions, V.shape)
+    sys_ = systeme(fixe)
+    en_cache = sys_['lu'] is not None
+    if not en_cache:
+        sys_['lu'] = spla.splu(sys_['A'])
+
+    V[sys_['libre']] = sys_['lu'].solve(second_membre(V, fixe, sys_['libre']))
+
+    noter("creux_lu", 1, 0.0)  # Une seule résolution directe
+    etat = "réutilisée" if en_cache else "calculée"
+    print(f"Résolution directe (LU creux, factorisation {etat}, "
+          f"{sys_['A'].shape[0]} inconnues)")
+    return V
+
+
+def relaxation_creux_gc(V, init_conditions, tol=1e-3, max_iter=10000):
+    # Gradient conjugué préconditionné par une factorisation LU incomplète
+    # (renumérotation symétrique, sans pivotage : elle reste symétrique comme
+    # A), elle aussi conservée par géométrie. Le point de départ est V : une
+    # solution précédente sert de démarrage à chaud.
+    V = init_conditions(V)
+    fixe = masque_dirichlet(init_conditions, V.shape)
+    sys_ = systeme(fixe)
+    A, libre = sys_['A'], sys_['libre']
+    if sys_['ilu'] is None:
+        sys_['ilu'] = spla.spilu(A, drop_tol=1e-3, permc_spec="MMD_AT_PLUS_A",
+                                 diag_pivot_thresh=0.0)
+    M = spla.LinearOperator(A.shape, sys_['ilu'].solve)
+
+    iterations = 0
+
+    def compter(xk):
+        nonlocal iterations
+        iterations += 1
+
+    u, info = spla.cg(A, second_membre(V, fixe, libre), x0=V[libre],
+                      rtol=0.0, atol=tol, maxiter=max_iter, M=M, callback=compter)
+    V[libre] = u
+
+    noter("creux_gc", iterations, tol if info == 0 else np.nan)
+    etat = "atteinte" if info == 0 else "non atteinte"
+    print(f"Convergence {etat} en {iterations} itérations (GC + ILU creux)")
+    return V
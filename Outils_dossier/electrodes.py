@@ -0,0 +1,58 @@
+import numpy as np
+from scipy import ndimage
+from Outils_dossier.superposition import electrodes
+
+
+# ===============================
+# Index des électrodes d'une géométrie
+# ===============================
+class IndexElectrodes:
+    # Construit une fois par géométrie à partir de init_conditions (mêmes
+    # paramètres a..f, N) :
+    #  - etiquettes : numéro de dynode de chaque case (0 = vide, 1..N dans
+    #    l'ordre des tensions) ;
+    #  - distance : distance signée à la dynode la plus proche, en pixels
+    #    (négative à l'intérieur, surface à mi-chemin entre deux cases) ;
+    #  - plus_proche : numéro de la dynode la plus proche de chaque case ;
+    #  - normale : gradient unitaire de la distance (sortant de la dynode).
+    # Les requêtes lisent la case la plus proche : coût constant par position.
+
+    def __init__(self, init_conditions, shape):
+        self.Ny, self.Nx = shape
+        self.etiquettes, self.tensions, _ = electrodes(init_conditions, shape)
+        dynode = self.etiquettes > 0
+
+        dist_ext, (jj, ii) = ndimage.distance_transform_edt(~dynode, return_indices=True)
+        dist_int = ndimage.distance_transform_edt(dynode)
+        self.distance = np.where(dynode, -(dist_int - 0.5), dist_ext - 0.5)
+        self.plus_proche = self.etiquettes[jj, ii]
+
+        gy, gx = np.gradient(self.distance)
+        norme = np.hypot(gx, gy)
+        norme[norme == 0] = 1.0
+        self.normale = np.stack((gx / norme, gy / norme), axis=-1)
+
+    def _case(self, x, y):
+        i = np.clip(np.rint(x).astype(np.intp), 0, self.Nx - 1)
+        j = np.clip(np.rint(y).astype(np.intp), 0, self.Ny - 1)
+        return j, i
+
+    def dynode(self, x, y):
+        # Numéro de la dynode contenant (x, y), 0 sinon
+        j, i = self._case(x, y)
+        return self.etiquettes[j, i]
+
+    def requete(self, x, y):
+        # Renvoie (dynode la plus proche, distance signée, normale (nx, ny))
+        # pour une position ou des tableaux de positions (pixels)
+        j, i = self._case(x, y)
+        n = self.normale[j, i]
+        return self.plus_proche[j, i], self.distance[j, i], (n[..., 0], n[..., 1])
+
+    def dynode_potentiel(self, V, x, y, marge=1.0):
+        # Ancien critère des questions 3a/3b : potentiel de la case à moins de
+        # `marge` V de celui d'une dynode. Il se déclenche aussi dans le vide
+        # (cases dont le potentiel passe par ces valeurs) ; gardé pour
+        # retrouver les anciennes trajectoires (critere="potentiel")
+        j, i = self._case(x, y)
+        return any(abs(V[j, i] - tension) <= marge for tension in self.tensions)
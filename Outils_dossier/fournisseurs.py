@@ -0,0 +1,40 @@
+import functools
+import importlib
+from Outils_dossier.cache import champs_en_cache
+
+
+# ===============================
+# Fournisseurs paresseux de potentiel / champ
+# ===============================
+# Les géométries sont désignées par le nom de leur module (init_conditions,
+# relaxation, scale, Nx, Ny) : rien n'est importé ni calculé avant le premier
+# appel, puis le résultat est mémorisé pour tout le processus.
+Q1 = "Q1_Calcul_Potentiel"
+Q1_POUR3C = "Q3_dossier.Q1_pour3c"
+Q1_POUR3D = "Q3_dossier.Q1_pour3d"
+
+
+def geometrie(nom):
+    return importlib.import_module(nom)
+
+
+@functools.lru_cache(maxsize=None)
+def potentiel(nom, tol=1e-3, methode="jacobi", precision="float64"):
+    g = geometrie(nom)
+    return champs_en_cache(g.init_conditions, g.relaxation, (g.Ny, g.Nx), g.scale,
+                           tol=tol, methode=methode, precision=precision)
+
+
+@functools.lru_cache(maxsize=None)
+def champs(nom, tol=1e-3, methode="jacobi", precision="float64"):
+    # Renvoie (V, Ex, Ey) ; precision="float32" divise la mémoire par deux
+    from Q2_Champ_Electrique import calcul_champ_electrique
+    g = geometrie(nom)
+    return champs_en_cache(g.init_conditions, g.relaxation, (g.Ny, g.Nx), g.scale,
+                           calcul_champ_electrique, tol=tol, methode=methode,
+                           precision=precision)
+
+
+def vider():
+    potentiel.cache_clear()
+    champs.cache_clear()
@@ -0,0 +1,132 @@
+import functools
+import numpy as np
+from Outils_dossier.solveurs import noter, resoudre
+from Outils_dossier.cache import champs_en_cache
+
+
+# ===============================
+# Géométrie paramétrée du tube (N dynodes quelconque)
+# ===============================
+# Même construction que Q1_Calcul_Potentiel / Q1_pour3c / Q1_pour3d : la
+# k-ième dynode (k = 0..N-1) est en bas si k est pair, en haut sinon, à
+# x = a + k/2 * (c + d), portée à (k + 1) * tension volts. Le masque des
+# cases imposées et leurs valeurs sont calculés une seule fois ; imposer
+# les conditions aux limites revient ensuite à un seul np.copyto.
+class Geometrie:
+    def __init__(self, N=4, a_mm=3.0, b_mm=2.0, c_mm=4.0, d_mm=2.0, e_mm=0.2, f_mm=6.0,
+                 scale=10, tension=100.0, ecart_mm=None, Nx=None):
+        # ecart_mm : None -> dynodes à b de la paroi (Q1_Calcul_Potentiel) ;
+        #            sinon centrées à f/2 -/+ ecart_mm (Q1_pour3c, Q1_pour3d)
+        # Nx : largeur imposée (cases) ; par défaut a + dernière dynode + a
+        self.parametres = dict(N=N, a_mm=a_mm, b_mm=b_mm, c_mm=c_mm, d_mm=d_mm, e_mm=e_mm,
+                               f_mm=f_mm, tension=tension, ecart_mm=ecart_mm)
+        self.Nx_impose = Nx
+        self.N, self.scale, self.tension = N, scale, tension
+        self.a, self.d = a_mm * scale, d_mm * scale
+        self.b, self.c = int(round(b_mm * scale)), int(round(c_mm * scale))
+        self.e, self.f = int(e_mm * scale), int(f_mm * scale)
+        a, c, d, e, f = self.a, self.c, self.d, self.e, self.f
+
+        self.Nx = int(a * 2 + c + (N - 1) / 2 * (c + d)) if Nx is None else Nx
+        self.Ny = f
+        if ecart_mm is None:
+            self.y_bas, self.y_haut = self.b, f - self.b - e
+        else:
+            self.y_bas = int(f / 2 - ecart_mm * scale - e / 2)
+            self.y_haut = int(f / 2 + ecart_mm * scale - e / 2)
+
+        # Dynodes dans l'ordre de passage (format de Q3_c)
+        self.dynodes = [{'x': int(a + k / 2 * (c + d)),
+                         'y': self.y_bas if k % 2 == 0 else self.y_haut,
+                         'c': c, 'e': e} for k in range(N)]
+
+    @property
+    def shape(self):
+        return (self.Ny, self.Nx)
+
+    # Masque et valeurs de toute la grille, construits au premier usage
+    @functools.cached_property
+    def fixe(self):
+        return self.bande(0, self.Ny)[0]
+
+    @functools.cached_property
+    def valeurs(self):
+        return self.bande(0, self.Ny)[1]
+
+    def bande(self, j0, j1):
+        # Masque et valeurs des lignes j0..j1-1 seulement, sans construire la
+        # grille entière (relaxation par tuiles, Outils_dossier.hors_memoire)
+        fixe = np.zeros((j1 - j0, self.Nx), dtype=bool)
+        valeurs = np.zeros((j1 - j0, self.Nx))
+        fixe[:, 0] = fixe[:, -1] = True
+        if j0 == 0:
+            fixe[0, :] = True
+        if j1 == self.Ny:
+            fixe[-1, :] = True
+        for k, dyn in enumerate(self.dynodes):
+            y0, y1 = max(dyn['y'], j0), min(dyn['y'] + self.e, j1)
+            if y0 < y1:
+                zone = (slice(y0 - j0, y1 - j0), slice(dyn['x'], dyn['x'] + self.c))
+                fixe[zone] = True
+                valeurs[zone] = self.tension * (k + 1)
+        return fixe, valeurs
+
+    def a_l_echelle(self, scale):
+        # Même tube à une autre résolution
+        Nx = None if self.Nx_impose is None else int(round(self.Nx_impose * scale / self.scale))
+        return Geometrie(scale=scale, Nx=Nx, **self.parametres)
+
+    def init_conditions(self, V):
+        np.copyto(V, self.valeurs, where=self.fixe)
+        return V
+
+    # ===============================
+    # Relaxation (même interface que les modules Q1)
+    # ===============================
+    def relaxation(self, V, tol=1e-3, max_iter=10000, methode="jacobi"):
+        if methode != "jacobi":
+            return resoudre(V, self.init_conditions, tol, max_iter, methode)
+
+        diff = tol + 1
+        iterations = 0
+
+        while diff > tol and iterations < max_iter:
+            V_old = V.copy()
+            V[1:-1, 1:-1] = 0.25 * (
+                V[2:, 1:-1] + V[:-2, 1:-1] +
+                V[1:-1, 2:] + V[1:-1, :-2]
+            )
+            V = self.init_conditions(V)
+            diff = np.max(np.abs(V - V_old))
+            iterations += 1
+
+        noter("jacobi", iterations, diff)
+        print(f"Convergence atteinte en {iterations} itérations (diff = {diff:.2e})")
+        return V
+
+    # ===============================
+    # Potentiel et champ (cache disque)
+    # ===============================
+    def calcul_champ_electrique(self, V):
+        # Comme Q2, avec le pas de cette géométrie
+        Ey, Ex = np.gradient(-V, 1 / self.scale, 1 / self.scale)
+        return Ex, Ey
+
+    def potentiel(self, tol=1e-3, methode="jacobi", precision="float64"):
+        return champs_en_cache(self.init_conditions, self.relaxation, self.shape, self.scale,
+                               tol=tol, methode=methode, precision=precision)
+
+    def champs(self, tol=1e-3, methode="jacobi", precision="float64"):
+        # Renvoie (V, Ex, Ey), dans la précision demandée
+        return champs_en_cache(self.init_conditions, self.relaxation, self.shape, self.scale,
+                               self.calcul_champ_electrique, tol=tol, methode=methode,
+                               precision=precision)
+
+
+# Tube des questions 3c/3d (réglage de Q1_pour3c) pour un nombre de dynodes
+# quelconque : tube(12), tube(16), tube(24)...
+def tube(N, scale=10, **reglages):
+    parametres = dict(a_mm=2.25, b_mm=2.0, c_mm=8.0, d_mm=6.8, e_mm=0.4, f_mm=10.86,
+                      ecart_mm=2.0)
+    parametres.update(reglages)
+    return Geometrie(N=N, scale=scale, **parametres)
@@ -0,0 +1,181 @@
+import hashlib
+import json
+import os
+import time
+import numpy as np
+from scipy import ndimage
+from Outils_dossier.solveurs import demi_pas_sor, noter, omega_optimal, type_flottant
+from Outils_dossier import cache
+from Outils_dossier.interpolation import EchantillonneurChamp
+
+# ===============================
+# Paramètres du mode hors mémoire
+# ===============================
+# V, Ex, Ey (et le champ entrelacé de l'échantillonneur) vivent dans des
+# fichiers np.memmap ; seule une tuile de `hauteur_tuile` lignes, plus une
+# ligne de halo de chaque côté, est en mémoire à la fois.
+hauteur_tuile = 256
+reduction_grossiere = 4  # Démarrage : solution en mémoire à scale / 4, interpolée
+
+
+# ===============================
+# Fichiers
+# ===============================
+def _meta(geometrie, tol, precision):
+    return {'parametres': geometrie.parametres, 'scale': geometrie.scale,
+            'shape': list(geometrie.shape), 'tol': tol, 'precision': precision}
+
+
+def ouvrir(chemin, nom, shape, dtype, mode):
+    return np.memmap(os.path.join(chemin, nom + ".dat"), dtype=dtype, mode=mode, shape=tuple(shape))
+
+
+def tuiles(Ny, hauteur=None):
+    hauteur = hauteur or hauteur_tuile
+    for j0 in range(0, Ny, hauteur):
+        yield j0, min(j0 + hauteur, Ny)
+
+
+# ===============================
+# Point de départ : solution grossière interpolée
+# ===============================
+def initialiser(geometrie, V, methode="multigrille", hauteur=None):
+    # Sans objet si la grille grossière ne résout plus l'épaisseur des dynodes
+    grossiere = geometrie.a_l_echelle(max(1, geometrie.scale // reduction_grossiere))
+    if grossiere.scale == geometrie.scale or grossiere.e < 1:
+        for j0, j1 in tuiles(geometrie.Ny, hauteur):
+            V[j0:j1] = 0.0
+        return
+    Vg = np.asarray(grossiere.potentiel(methode=methode))
+    Ny, Nx = geometrie.shape
+    ry = (grossiere.Ny - 1) / (Ny - 1)
+    rx = (grossiere.Nx - 1) / (Nx - 1)
+    xx = np.arange(Nx) * rx
+    for j0, j1 in tuiles(Ny, hauteur):
+        yy, xg = np.meshgrid(np.arange(j0, j1) * ry, xx, indexing="ij")
+        V[j0:j1] = ndimage.map_coordinates(Vg, [yy, xg], order=1, mode="nearest")
+
+
+# ===============================
+# SOR rouge-noir par tuiles
+# ===============================
+def balayage_tuile(V, geometrie, j0, j1, omega):
+    # Lignes j0-1..j1 (halo compris) lues dans le fichier ; seules les lignes
+    # j0..j1-1 sont mises à jour puis réécrites (le halo du bas a déjà son
+    # itération courante, celui du haut la précédente). Les couleurs suivent la
+    # parité globale (i + j), comme relaxation_sor.
+    Ny, Nx = V.shape
+    h0, h1 = max(j0 - 1, 0), min(j1 + 1, Ny)
+    bloc = np.array(V[h0:h1])
+    fixe = geometrie.bande(h0, h1)[0]
+    libre = ~fixe[1:-1, 1:-1]
+    jj, ii = np.indices(libre.shape)
+    parite = (ii + jj + h0) % 2
+    tampon = np.empty(libre.shape)
+    diff = max(demi_pas_sor(bloc, libre & (parite == couleur), omega, tampon)
+               for couleur in (0, 1))
+    V[j0:j1] = bloc[j0 - h0:j1 - h0]
+    return diff
+
+
+def relaxation_tuiles(geometrie, V, tol=1e-3, max_iter=10000, hauteur=None):
+    Ny, Nx = V.shape
+    omega = omega_optimal(Ny, Nx)
+    # Conditions aux limites écrites une fois, tuile par tuile
+    for j0, j1 in tuiles(Ny, hauteur):
+        fixe, valeurs = geometrie.bande(j0, j1)
+        np.copyto(V[j0:j1], valeurs, where=fixe)
+
+    diff = tol + 1
+    iterations = 0
+    while diff > tol and iterations < max_iter:
+        diff = max(balayage_tuile(V, geometrie, j0, j1, omega) for j0, j1 in tuiles(Ny, hauteur))
+        iterations += 1
+    V.flush()
+    noter("hors_memoire", iterations, diff)
+    print(f"Convergence atteinte en {iterations} itérations "
+          f"(SOR par tuiles hors mémoire, omega = {omega:.3f}, diff = {diff:.2e})")
+    return iterations
+
+
+# ===============================
+# Gradient par tuiles
+# ===============================
+def gradient_tuiles(V, Ex, Ey, E, scale, hauteur=None):
+    # Mêmes valeurs que np.gradient(-V, 1/scale, 1/scale) sur toute la grille :
+    # la ligne de halo fournit la différence centrée en bord de tuile
+    Ny = V.shape[0]
+    h = 1 / scale
+    for j0, j1 in tuiles(Ny, hauteur):
+        h0, h1 = max(j0 - 1, 0), min(j1 + 1, Ny)
+        bloc = -np.asarray(V[h0:h1])
+        gy, gx = np.gradient(bloc, h, h) if bloc.shape[0] > 1 else (np.zeros_like(bloc),
+                                                                  np.gradient(bloc, h, axis=1))
+        Ex[j0:j1] = gx[j0 - h0:j1 - h0]
+        Ey[j0:j1] = gy[j0 - h0:j1 - h0]
+        E[j0:j1, :, 0] = Ex[j0:j1]
+        E[j0:j1, :, 1] = Ey[j0:j1]
+    for tableau in (Ex, Ey, E):
+        tableau.flush()
+
+
+# ===============================
+# Potentiel et champ hors mémoire
+# ===============================
+def champs_hors_memoire(geometrie, chemin=None, tol=1e-3, max_iter=10000, precision="float64",
+                        hauteur=None):
+    # Renvoie (V, Ex, Ey) projetés en mémoire (lecture seule). Un calcul
+    # terminé pour les mêmes paramètres est rouvert tel quel.
+    dtype = type_flottant(precision)
+    meta = _meta(geometrie, tol, precision)
+    if chemin is None:
+        cle = hashlib.sha1(json.dumps(meta, sort_keys=True).encode()).hexdigest()
+        chemin = os.path.join(cache.dossier, "hors_memoire", cle)
+    os.makedirs(chemin, exist_ok=True)
+    fichier_meta = os.path.join(chemin, "meta.json")
+    shape = geometrie.shape
+
+    if os.path.exists(fichier_meta):
+        with open(fichier_meta) as f:
+            if json.load(f) == {**meta, 'termine': True}:
+                print(f"Potentiel hors mémoire relu ({chemin})")
+                return tuple(ouvrir(chemin, nom, shape, dtype, "r") for nom in ("V", "Ex", "Ey"))
+
+    t0 = time.perf_counter()
+    V = ouvrir(chemin, "V", shape, dtype, "w+")
+    initialiser(geometrie, V, hauteur=hauteur)
+    relaxation_tuiles(geometrie, V, tol, max_iter, hauteur)
+    Ex = ouvrir(chemin, "Ex", shape, dtype, "w+")
+    Ey = ouvrir(chemin, "Ey", shape, dtype, "w+")
+    E = ouvrir(chemin, "E", (*shape, 2), dtype, "w+")
+    gradient_tuiles(V, Ex, Ey, E, geometrie.scale, hauteur)
+    del V, Ex, Ey, E
+
+    with open(fichier_meta, "w") as f:
+        json.dump({**meta, 'termine': True}, f)
+    print(f"Potentiel et champ hors mémoire : {shape[0]} x {shape[1]} cases, "
+          f"{time.perf_counter() - t0:.1f} s ({chemin})")
+    return tuple(ouvrir(chemin, nom, shape, dtype, "r") for nom in ("V", "Ex", "Ey"))
+
+
+def echantillonneur(V):
+    # EchantillonneurChamp sur le champ entrelacé écrit à côté de V : seules
+    # les pages lues par les électrons sont chargées
+    chemin = os.path.dirname(V.filename)
+    return EchantillonneurChamp.depuis_table(ouvrir(chemin, "E", (*V.shape, 2), V.dtype, "r"))
+
+
+def main(scale=40):
+    from Q3_dossier.Q1_pour3d import geometrie
+    from Outils_dossier.jit import trajectoire_euler
+    g = geometrie.a_l_echelle(scale)
+    V, Ex, Ey = champs_hors_memoire(g)
+    k_acc = (-1.602e-19 / 9.109e-31) * scale * 1e3
+    positions, touchees, instants = trajectoire_euler(
+        Ex, Ey, 0.0, g.Ny / 2, 0.0, 0.0, 3e-11, int(3.15e-7 / 3e-11), k_acc,
+        dynodes=g.dynodes, rebond_pixels=2 * scale, details=True)
+    print(f"scale = {scale} : {touchees}/{g.N} dynodes, transit {instants[-1]:.3e} s")
+
+
+if __name__ == "__main__":
+    main()
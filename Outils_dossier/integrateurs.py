@@ -0,0 +1,226 @@
+import numpy as np
+from scipy.optimize import brentq
+from Outils_dossier import telemetrie
+
+
+# ===============================
+# Surfaces d'événements
+# ===============================
+def distance_sortie(champ, x, y):
+    # > 0 dans la grille [0, Nx-1] x [0, Ny-1], s'annule au bord
+    return min(x, champ.Nx - 1 - x, y, champ.Ny - 1 - y)
+
+
+def distance_dynode(dynode, x, y):
+    # Distance signée au rectangle {'x', 'y', 'c', 'e'} (négative à l'intérieur)
+    cx = dynode['x'] + 0.5 * dynode['c']
+    cy = dynode['y'] + 0.5 * dynode['e']
+    qx = abs(x - cx) - 0.5 * dynode['c']
+    qy = abs(y - cy) - 0.5 * dynode['e']
+    exterieur = np.hypot(max(qx, 0.0), max(qy, 0.0))
+    return exterieur + min(max(qx, qy), 0.0)
+
+
+# ===============================
+# Pas élémentaires (état s = x, y, vx, vy en pixels, pixels/s)
+# ===============================
+def derivee(champ, k_acc, s):
+    ex, ey = champ(s[0], s[1])
+    return np.array([s[2], s[3], k_acc * ex, k_acc * ey])
+
+
+# Coefficients de Dormand-Prince 5(4)
+_C = np.array([0, 1 / 5, 3 / 10, 4 / 5, 8 / 9, 1, 1])
+_A = [
+    [],
+    [1 / 5],
+    [3 / 40, 9 / 40],
+    [44 / 45, -56 / 15, 32 / 9],
+    [19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729],
+    [9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656],
+    [35 / 384, 0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84],
+]
+_B5 = np.array([35 / 384, 0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84, 0])
+_B4 = np.array([5179 / 57600, 0, 7571 / 16695, 393 / 640, -92097 / 339200, 187 / 2100, 1 / 40])
+
+
+def pas_rk45(champ, k_acc, s, h, d0=None):
+    # Renvoie (nouvel état d'ordre 5, estimation d'erreur, nb d'évaluations,
+    # dérivée au nouvel état). Dormand-Prince est FSAL : la dernière étape est
+    # la dérivée au nouvel état, que le pas suivant reprend comme première
+    # étape (d0) ; 6 évaluations par pas au lieu de 7
+    k = np.empty((7, 4))
+    n_eval = 6
+    if d0 is None:
+        d0 = derivee(champ, k_acc, s)
+        n_eval = 7
+    k[0] = d0
+    for i in range(1, 6):
+        k[i] = derivee(champ, k_acc, s + h * np.dot(_A[i], k[:i]))
+    s5 = s + h * np.dot(_B5[:6], k[:6])
+    k[6] = derivee(champ, k_acc, s5)
+    erreur = h * np.dot(_B5 - _B4, k)
+    return s5, erreur, n_eval, k[6]
+
+
+def pas_verlet(champ, k_acc, s, h, d0=None):
+    # Verlet vitesse ; l'erreur est estimée par doublement de pas
+    # (un pas h comparé à deux pas h/2). L'accélération en s est commune au
+    # pas h et au premier pas h/2 (et reprise du pas précédent via d0), celle
+    # du milieu est commune aux deux pas h/2 : restent les arrivées du pas h,
+    # du premier et du second pas h/2, soit 3 évaluations par pas (4 sans d0)
+    def verlet(s, h, a):
+        vx = s[2] + 0.5 * h * a[0]
+        vy = s[3] + 0.5 * h * a[1]
+        x = s[0] + h * vx
+        y = s[1] + h * vy
+        a_fin = derivee(champ, k_acc, np.array([x, y, 0.0, 0.0]))[2:]
+        return np.array([x, y, vx + 0.5 * h * a_fin[0], vy + 0.5 * h * a_fin[1]]), a_fin
+
+    n_eval = 3
+    if d0 is None:
+        d0 = derivee(champ, k_acc, s)
+        n_eval = 4
+    grossier, _ = verlet(s, h, d0[2:])
+    milieu, a_milieu = verlet(s, 0.5 * h, d0[2:])
+    fin, a_fin = verlet(milieu, 0.5 * h, a_milieu)
+    return fin, (fin - grossier) / 3.0, n_eval, np.concatenate((fin[2:], a_fin))
+
+
+STEPPERS = {
+    "rk45": (pas_rk45, 5),
+    "verlet": (pas_verlet, 3),
+}
+
+
+# ===============================
+# Interpolation entre deux pas (Hermite cubique sur la position)
+# ===============================
+def hermite(s0, s1, h, theta):
+    h00 = 2 * theta ** 3 - 3 * theta ** 2 + 1
+    h10 = theta ** 3 - 2 * theta ** 2 + theta
+    h01 = -2 * theta ** 3 + 3 * theta ** 2
+    h11 = theta ** 3 - theta ** 2
+    pos = h00 * s0[:2] + h10 * h * s0[2:] + h01 * s1[:2] + h11 * h * s1[2:]
+    d00 = 6 * theta ** 2 - 6 * theta
+    d10 = 3 * theta ** 2 - 4 * theta + 1
+    d01 = -6 * theta ** 2 + 6 * theta
+    d11 = 3 * theta ** 2 - 2 * theta
+    vit = (d00 * s0[:2] + d01 * s1[:2]) / h + d10 * s0[2:] + d11 * s1[2:]
+    return np.concatenate((pos, vit))
+
+
+# ===============================
+# Intégrateur adaptatif avec détection d'événements
+# ===============================
+def integrer(champ, etat0, k_acc, methode="rk45", dynodes=(), rebond_pixels=None,
+             dt0=3e-11, tol_position=1e-3, rtol=1e-6, max_deplacement=1.0, t_max=1e-5,
+             max_pas=100000):
+    # Intègre jusqu'au premier événement terminal : sortie de la grille ou
+    # contact avec une dynode (liste de dicts {'x', 'y', 'c', 'e'} comme dans
+    # Q3_c/Q3_d). Plus besoin de fixer duree_totale : t_max n'est qu'un
+    # garde-fou. L'erreur locale est contrôlée en pixels (tol_position, rtol)
+    # et max_deplacement empêche de sauter par-dessus une dynode mince.
+    # Avec rebond_pixels, les dynodes sont visées dans l'ordre comme dans
+    # trajectoire_euler : au contact de la suivante, l'électron est déplacé de
+    # rebond_pixels en y à l'opposé de sa vitesse, vy est annulée et
+    # l'intégration reprend ; seules la sortie et t_max sont alors terminales.
+    # Renvoie un dict : temps, etats (n, 4), evenement ('sortie', 'dynode',
+    # 't_max'), dynode (indice ou None), touchees, instants (instant de chaque
+    # impact, NaN si non atteinte), nb_evaluations, pas_rejetes.
+    pas, ordre = STEPPERS[methode]
+    surfaces = [lambda x, y: distance_sortie(champ, x, y)]
+    surfaces += [lambda x, y, d=d: distance_dynode(d, x, y) for d in dynodes]
+    instants = np.full(len(dynodes), np.nan)
+    prochaine = 0  # Dynode visée (mode rebond)
+
+    s = np.asarray(etat0, dtype=float)
+    t = 0.0
+    h = dt0
+    temps = [t]
+    etats = [s.copy()]
+    g = [surface(s[0], s[1]) for surface in surfaces]
+    d0 = derivee(champ, k_acc, s)  # Dérivée en s, reprise d'un pas à l'autre
+    evaluations = 1
+    rejetes = 0
+    evenement, dynode = "t_max", None
+
+    while t < t_max and len(temps) < max_pas:
+        # Pas limité pour que le déplacement reste sous max_deplacement
+        vitesse = np.hypot(s[2], s[3])
+        if vitesse > 0:
+            h = min(h, 0.9 * max_deplacement / vitesse)
+        h = min(h, t_max - t)
+        s_new, erreur, n_eval, d_new = pas(champ, k_acc, s, h, d0)
+        evaluations += n_eval
+
+        # Norme d'erreur : positions en pixels, vitesses ramenées à un
+        # déplacement sur le pas
+        echelle = tol_position + rtol * np.maximum(np.abs(s[:2]), np.abs(s_new[:2]))
+        err = max(np.max(np.abs(erreur[:2]) / echelle),
+                  np.max(np.abs(erreur[2:] * h) / echelle))
+        deplacement = np.hypot(*(s_new[:2] - s[:2]))
+        if err > 1.0 or deplacement > max_deplacement:
+            facteur = 0.9 * err ** (-1 / ordre) if err > 1.0 else 1.0
+            if deplacement > max_deplacement:
+                facteur = min(facteur, 0.9 * max_deplacement / deplacement)
+            h *= max(0.1, facteur)
+            rejetes += 1
+            continue
+
+        # Événements : une surface franchie sur le pas accepté, ou déjà
+        # dépassée (départ sur le bord ou dans une dynode : événement immédiat)
+        if rebond_pixels is None:
+            actives = range(len(surfaces))
+        else:
+            actives = [0] + ([prochaine + 1] if prochaine < len(dynodes) else [])
+        g_new = [surface(s_new[0], s_new[1]) for surface in surfaces]
+        croisees = [k for k in actives if g_new[k] < 0 or g[k] > 0 >= g_new[k]]
+        if croisees:
+            racines = []
+            for k in croisees:
+                f = lambda theta, k=k: surfaces[k](*hermite(s, s_new, h, theta)[:2])
+                racines.append((brentq(f, 0.0, 1.0, xtol=1e-10) if g[k] > 0 else 0.0, k))
+            theta, k = min(racines)
+            s_new = hermite(s, s_new, h, theta)
+            t += theta * h
+            temps.append(t)
+            etats.append(s_new)
+            if k == 0:
+                evenement = "sortie"
+                break
+            instants[k - 1] = t
+            if rebond_pixels is None:
+                evenement, dynode = "dynode", k - 1
+                break
+            # Rebond : même modèle que trajectoire_euler (Q3_c/Q3_d)
+            s = s_new.copy()
+            s[1] += (-1.0 if s[3] > 0 else 1.0) * rebond_pixels
+            s[3] = 0.0
+            prochaine += 1
+            temps.append(t)
+            etats.append(s.copy())
+            g = [surface(s[0], s[1]) for surface in surfaces]
+            d0 = derivee(champ, k_acc, s)
+            evaluations += 1
+            continue
+
+        t += h
+        s, g, d0 = s_new, g_new, d_new
+        temps.append(t)
+        etats.append(s.copy())
+        facteur = 0.9 * err ** (-1 / ordre) if err > 0 else 5.0
+        h *= min(5.0, max(0.2, facteur))
+
+    telemetrie.compter("pas_trajectoire", len(temps) - 1)
+    telemetrie.compter("pas_rejetes", rejetes)
+    return {
+        'temps': np.array(temps),
+        'etats': np.array(etats),
+        'evenement': evenement,
+        'dynode': dynode,
+        'touchees': int(np.count_nonzero(~np.isnan(instants))),
+        'instants': instants,
+        'nb_evaluations': evaluations,
+        'pas_rejetes': rejetes,
+    }
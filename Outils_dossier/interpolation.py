@@ -0,0 +1,162 @@
+import numpy as np
+from scipy import ndimage
+from Outils_dossier import telemetrie
+
+
+# ===============================
+# Échantillonneur bilinéaire du champ (Ex, Ey fusionnés)
+# ===============================
+class EchantillonneurChamp:
+    # Remplace la paire RegularGridInterpolator((y, x), Ex / Ey,
+    # bounds_error=False, fill_value=0) : Ex et Ey sont entrelacés dans un seul
+    # tableau contigu (Ny, Nx, 2), si bien qu'une lecture de case donne les
+    # deux composantes. Positions en pixels ; hors de la grille, le champ vaut 0.
+    # La table garde la précision du champ (float32 : moitié moins de
+    # mémoire) ; poids et sommes d'interpolation restent en float64.
+
+    def __init__(self, Ex, Ey):
+        self.Ny, self.Nx = Ex.shape
+        self.E = np.empty((self.Ny, self.Nx, 2), dtype=np.result_type(Ex, Ey, np.float32))
+        self.E[..., 0] = Ex
+        self.E[..., 1] = Ey
+        self.nb_appels = 0
+
+    @classmethod
+    def depuis_table(cls, E):
+        # Table (Ny, Nx, 2) déjà entrelacée (par ex. np.memmap de
+        # Outils_dossier.hors_memoire) : utilisée telle quelle, sans copie
+        self = cls.__new__(cls)
+        self.Ny, self.Nx = E.shape[:2]
+        self.E = E
+        self.nb_appels = 0
+        return self
+
+    def __call__(self, x, y):
+        self.nb_appels += 1
+        telemetrie.compter("appels_interpolation")
+        if np.ndim(x) == 0 and np.ndim(y) == 0:
+            return self.scalaire(float(x), float(y))
+        return self.lot(np.asarray(x, dtype=float), np.asarray(y, dtype=float))
+
+    def scalaire(self, x, y):
+        if not (0.0 <= x <= self.Nx - 1 and 0.0 <= y <= self.Ny - 1):
+            return 0.0, 0.0
+        i = min(int(x), self.Nx - 2)
+        j = min(int(y), self.Ny - 2)
+        tx = x - i
+        ty = y - j
+        E = self.E
+        e00, e10 = E[j, i], E[j, i + 1]
+        e01, e11 = E[j + 1, i], E[j + 1, i + 1]
+        ex = ((1 - tx) * e00[0] + tx * e10[0]) * (1 - ty) + ((1 - tx) * e01[0] + tx * e11[0]) * ty
+        ey = ((1 - tx) * e00[1] + tx * e10[1]) * (1 - ty) + ((1 - tx) * e01[1] + tx * e11[1]) * ty
+        return float(ex), float(ey)
+
+    def lot(self, x, y):
+        dedans = (x >= 0) & (x <= self.Nx - 1) & (y >= 0) & (y <= self.Ny - 1)
+        i = np.clip(np.floor(x).astype(np.intp), 0, self.Nx - 2)
+        j = np.clip(np.floor(y).astype(np.intp), 0, self.Ny - 2)
+        tx = np.where(dedans, x - i, 0.0)
+        ty = y - j
+        # Poids nuls hors de la grille : reproduit fill_value=0
+        w00 = (1 - tx) * (1 - ty) * dedans
+        w10 = tx * (1 - ty) * dedans
+        w01 = (1 - tx) * ty * dedans
+        w11 = tx * ty * dedans
+        E = self.E.reshape(-1, 2)
+        k = j * self.Nx + i
+        e = (w00[..., None] * E[k] + w10[..., None] * E[k + 1]
+             + w01[..., None] * E[k + self.Nx] + w11[..., None] * E[k + self.Nx + 1])
+        return e[..., 0], e[..., 1]
+
+
+# ===============================
+# Spline bicubique du potentiel (champ = gradient exact)
+# ===============================
+marge_spline = 8  # Prolongement de V avant ajustement (influence du bord en 0.27 ** marge)
+
+
+def _poids_bspline(t):
+    # Poids des nœuds i-1..i+2 de la B-spline cubique et leurs dérivées en t
+    u = 1 - t
+    poids = (u ** 3 / 6, (3 * t ** 3 - 6 * t ** 2 + 4) / 6,
+             (-3 * t ** 3 + 3 * t ** 2 + 3 * t + 1) / 6, t ** 3 / 6)
+    derivees = (-u ** 2 / 2, (3 * t ** 2 - 4 * t) / 2, (-3 * t ** 2 + 2 * t + 1) / 2, t ** 2 / 2)
+    return poids, derivees
+
+
+class SplineChamp:
+    # Même interface qu'EchantillonneurChamp, mais construit sur V seul : une
+    # spline bicubique (B-spline interpolante) est ajustée une fois sur V, et
+    # E = -grad V est la dérivée exacte de cette spline.
+    # Le champ est continu ainsi que ses dérivées premières (au lieu d'être
+    # bilinéaire par morceaux sur des différences centrées) et seule la
+    # table des coefficients, de la taille de V, est gardée en mémoire.
+    # Positions en pixels, E en V/mm (scale pixels par mm) ; 0 hors de la grille.
+
+    def __init__(self, V, scale):
+        self.Ny, self.Nx = V.shape
+        self.scale = scale
+        dtype = np.result_type(V, np.float32)
+        # V est prolongé par symétrie centrale (V[-k] = 2 V[0] - V[k]) avant
+        # l'ajustement : un miroir simple annulerait le champ normal aux
+        # parois. On garde une case de marge pour le voisinage 4 x 4 des bords.
+        m = marge_spline
+        etendu = np.pad(np.asarray(V, dtype=np.float64), m, mode="reflect", reflect_type="odd")
+        coefficients = ndimage.spline_filter(etendu, order=3, mode="mirror")
+        self.C = coefficients[m - 1:-(m - 1), m - 1:-(m - 1)].astype(dtype)
+        self.nb_appels = 0
+
+    def __call__(self, x, y):
+        self.nb_appels += 1
+        telemetrie.compter("appels_interpolation")
+        if np.ndim(x) == 0 and np.ndim(y) == 0:
+            return self.scalaire(float(x), float(y))
+        return self.lot(np.asarray(x, dtype=float), np.asarray(y, dtype=float))
+
+    def potentiel(self, x, y):
+        x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+        i, j, (wx, _), (wy, _) = self._cellules(x, y)
+        return np.einsum("a...,b...,...ab->...", wy, wx, self._voisinage(i, j))
+
+    def scalaire(self, x, y):
+        if not (0.0 <= x <= self.Nx - 1 and 0.0 <= y <= self.Ny - 1):
+            return 0.0, 0.0
+        i = min(int(x), self.Nx - 2)
+        j = min(int(y), self.Ny - 2)
+        wx, dx = _poids_bspline(x - i)
+        wy, dy = _poids_bspline(y - j)
+        # Sommes en flottants Python : plus rapide que numpy pour 16 termes
+        P = self.C[j:j + 4, i:i + 4].tolist()
+        ex = ey = 0.0
+        for a in range(4):
+            ligne = P[a]
+            sx = ligne[0] * dx[0] + ligne[1] * dx[1] + ligne[2] * dx[2] + ligne[3] * dx[3]
+            sw = ligne[0] * wx[0] + ligne[1] * wx[1] + ligne[2] * wx[2] + ligne[3] * wx[3]
+            ex += wy[a] * sx
+            ey += dy[a] * sw
+        return -self.scale * ex, -self.scale * ey
+
+    def lot(self, x, y):
+        dedans = (x >= 0) & (x <= self.Nx - 1) & (y >= 0) & (y <= self.Ny - 1)
+        i, j, (wx, dx), (wy, dy) = self._cellules(x, y)
+        P = self._voisinage(i, j)
+        ex = -self.scale * np.einsum("a...,b...,...ab->...", wy, dx, P)
+        ey = -self.scale * np.einsum("a...,b...,...ab->...", dy, wx, P)
+        return np.where(dedans, ex, 0.0), np.where(dedans, ey, 0.0)
+
+    def _cellules(self, x, y):
+        i = np.clip(np.floor(x).astype(np.intp), 0, self.Nx - 2)
+        j = np.clip(np.floor(y).astype(np.intp), 0, self.Ny - 2)
+        tx = np.clip(x - i, 0.0, 1.0)
+        ty = np.clip(y - j, 0.0, 1.0)
+        # Poids empilés : (4, ...) pour chaque direction
+        (wx, dx), (wy, dy) = (map(np.array, _poids_bspline(t)) for t in (tx, ty))
+        return i, j, (wx, dx), (wy, dy)
+
+    def _voisinage(self, i, j):
+        # Coefficients (..., 4, 4) des nœuds j-1..j+2 x i-1..i+2 (indices décalés par la marge)
+        n = np.arange(4)
+        lignes = j[..., None, None] + n[:, None]
+        colonnes = i[..., None, None] + n[None, :]
+        return self.C[lignes, colonnes]
@@ -0,0 +1,251 @@
+import numpy as np
+from Outils_dossier.solveurs import masque_dirichlet, noter, omega_optimal, relaxation_sor
+from Outils_dossier import telemetrie
+
+# ===============================
+# Numba optionnel
+# ===============================
+# Sans Numba, le balayage retombe sur la SOR NumPy et le pousseur d'électron
+# s'exécute tel quel en Python (mêmes résultats, vitesse d'origine).
+try:
+    from numba import njit
+    NUMBA_DISPONIBLE = True
+except ImportError:
+    njit = None
+    NUMBA_DISPONIBLE = False
+
+
+def _compiler(fonction):
+    if NUMBA_DISPONIBLE:
+        return njit(cache=True, nogil=True)(fonction)
+    return fonction
+
+
+# ===============================
+# Balayage SOR rouge-noir compilé
+# ===============================
+@_compiler
+def _balayage_sor(V, fixe, omega):
+    Ny, Nx = V.shape
+    diff = 0.0
+    for couleur in range(2):
+        for j in range(1, Ny - 1):
+            debut = 1 + (j + 1 + couleur) % 2
+            for i in range(debut, Nx - 1, 2):
+                if fixe[j, i]:
+                    continue
+                # 0.0 + ... : somme accumulée en float64 même si V est en float32
+                delta = omega * (0.25 * (0.0 + V[j + 1, i] + V[j - 1, i] + V[j, i + 1] + V[j, i - 1])
+                                 - V[j, i])
+                V[j, i] += delta
+                if abs(delta) > diff:
+                    diff = abs(delta)
+    return diff
+
+
+def relaxation_jit(V, init_conditions, tol=1e-3, max_iter=10000):
+    if not NUMBA_DISPONIBLE:
+        return relaxation_sor(V, init_conditions, tol, max_iter)
+
+    V = init_conditions(V)
+    fixe = masque_dirichlet(init_conditions, V.shape)
+    omega = omega_optimal(*V.shape)
+
+    diff = tol + 1
+    iterations = 0
+    while diff > tol and iterations < max_iter:
+        diff = _balayage_sor(V, fixe, omega)
+        iterations += 1
+
+    noter("jit", iterations, diff)
+    print(f"Convergence atteinte en {iterations} itérations "
+          f"(SOR rouge-noir Numba, omega = {omega:.3f}, diff = {diff:.2e})")
+    return V
+
+
+# ===============================
+# Pousseur d'électron compilé (interpolation bilinéaire + Euler)
+# ===============================
+@_compiler
+def _champ_bilineaire(Ex, Ey, x, y):
+    # Équivalent de RegularGridInterpolator((y, x), E, fill_value=0)
+    Ny, Nx = Ex.shape
+    if not (0.0 <= x <= Nx - 1 and 0.0 <= y <= Ny - 1):
+        return 0.0, 0.0
+    i = min(int(x), Nx - 2)
+    j = min(int(y), Ny - 2)
+    tx = x - i
+    ty = y - j
+    w00 = (1 - tx) * (1 - ty)
+    w10 = tx * (1 - ty)
+    w01 = (1 - tx) * ty
+    w11 = tx * ty
+    ex = w00 * Ex[j, i] + w10 * Ex[j, i + 1] + w01 * Ex[j + 1, i] + w11 * Ex[j + 1, i + 1]
+    ey = w00 * Ey[j, i] + w10 * Ey[j, i + 1] + w01 * Ey[j + 1, i] + w11 * Ey[j + 1, i + 1]
+    return ex, ey
+
+
+@_compiler
+def _pousser(Ex, Ey, x, y, vx, vy, dt, nb_steps, k_acc, borner, dynodes, rebond_pixels,
+             positions, impacts):
+    Ny, Nx = Ex.shape
+    positions[0, 0] = x
+    positions[0, 1] = y
+    n = 1
+    dynode_idx = 0
+    for step in range(nb_steps):
+        if not (0 <= x < Nx and 0 <= y < Ny):
+            break
+
+        ex, ey = _champ_bilineaire(Ex, Ey, x, y)
+        vx += k_acc * ex * dt
+        vy += k_acc * ey * dt
+        x += vx * dt
+        y += vy * dt
+
+        if borner:
+            x = min(max(x, 0.0), Nx - 1.0)
+            y = min(max(y, 0.0), Ny - 1.0)
+
+        # Dynodes visées dans l'ordre : (x, y, longueur c, épaisseur e)
+        if dynode_idx < dynodes.shape[0]:
+            dx0, dy0, dc, de = dynodes[dynode_idx]
+            if dx0 <= x <= dx0 + dc and dy0 <= y <= dy0 + de:
+                direction = -1.0 if vy > 0 else 1.0
+                y += direction * rebond_pixels
+                vy = 0.0
+                impacts[dynode_idx] = step + 1
+                dynode_idx += 1
+
+        positions[n, 0] = x
+        positions[n, 1] = y
+        n += 1
+    return n, dynode_idx
+
+
+def trajectoire_euler(Ex, Ey, x0, y0, vx0, vy0, dt, nb_steps, k_acc,
+                      borner=True, dynodes=None, rebond_pixels=0.0, details=False):
+    # Positions en pixels, shape (n, 2). k_acc = (q/m) * scale * 1e3 convertit
+    # le champ (V/mm) en accélération (pixels/s²) comme dans les questions 3.
+    # dynodes : liste de dicts {'x', 'y', 'c', 'e'} ou tableau (K, 4).
+    # details=True renvoie aussi le nombre de dynodes touchées dans l'ordre
+    # et l'instant (s) de chaque impact (NaN pour les dynodes non atteintes).
+    if dynodes is None:
+        dynodes = np.zeros((0, 4))
+    elif len(dynodes) and isinstance(dynodes[0], dict):
+        dynodes = np.array([[d['x'], d['y'], d['c'], d['e']] for d in dynodes], dtype=float)
+    # Un champ float32 reste en float32 (pas de copie en float64) ; la
+    # position et la vitesse de l'électron sont toujours en float64
+    dtype = np.result_type(Ex, Ey, np.float32)
+    positions = np.empty((nb_steps + 1, 2))
+    impacts = -np.ones(len(dynodes), dtype=np.int64)
+    with telemetrie.etape("integration"):
+        n, touchees = _pousser(np.ascontiguousarray(Ex, dtype=dtype), np.ascontiguousarray(Ey, dtype=dtype),
+                     float(x0), float(y0), float(vx0), float(vy0), float(dt), int(nb_steps),
+                     float(k_acc), bool(borner), np.asarray(dynodes, dtype=float),
+                     float(rebond_pixels), positions, impacts)
+        # Une interpolation bilinéaire du champ par pas, dans la boucle compilée
+        telemetrie.compter("pas_trajectoire", n - 1)
+        telemetrie.compter("appels_interpolation", n - 1)
+    if details:
+        return positions[:n], touchees, np.where(impacts >= 0, impacts * dt, np.nan)
+    return positions[:n]
+
+
+# ===============================
+# Pousseur 3D (interpolation trilinéaire + Euler)
+# ===============================
+@_compiler
+def _champ_trilineaire(Ex, Ey, Ez, x, y, z):
+    # Grilles (Nz, Ny, Nx) ; champ nul hors de la grille
+    Nz, Ny, Nx = Ex.shape
+    if not (0.0 <= x <= Nx - 1 and 0.0 <= y <= Ny - 1 and 0.0 <= z <= Nz - 1):
+        return 0.0, 0.0, 0.0
+    i = min(int(x), Nx - 2)
+    j = min(int(y), Ny - 2)
+    k = min(int(z), Nz - 2)
+    tx = x - i
+    ty = y - j
+    tz = z - k
+    ex = 0.0
+    ey = 0.0
+    ez = 0.0
+    for dk in range(2):
+        wz = tz if dk else 1 - tz
+        for dj in range(2):
+            wy = ty if dj else 1 - ty
+            for di in range(2):
+                w = wz * wy * (tx if di else 1 - tx)
+                ex += w * Ex[k + dk, j + dj, i + di]
+                ey += w * Ey[k + dk, j + dj, i + di]
+                ez += w * Ez[k + dk, j + dj, i + di]
+    return ex, ey, ez
+
+
+@_compiler
+def _pousser_3d(Ex, Ey, Ez, x, y, z, vx, vy, vz, dt, nb_steps, k_acc, borner, dynodes,
+                rebond_pixels, positions, impacts):
+    Nz, Ny, Nx = Ex.shape
+    positions[0, 0] = x
+    positions[0, 1] = y
+    positions[0, 2] = z
+    n = 1
+    dynode_idx = 0
+    for step in range(nb_steps):
+        if not (0 <= x < Nx and 0 <= y < Ny and 0 <= z < Nz):
+            break
+
+        ex, ey, ez = _champ_trilineaire(Ex, Ey, Ez, x, y, z)
+        vx += k_acc * ex * dt
+        vy += k_acc * ey * dt
+        vz += k_acc * ez * dt
+        x += vx * dt
+        y += vy * dt
+        z += vz * dt
+
+        if borner:
+            x = min(max(x, 0.0), Nx - 1.0)
+            y = min(max(y, 0.0), Ny - 1.0)
+            z = min(max(z, 0.0), Nz - 1.0)
+
+        # Dynodes visées dans l'ordre : (x, y, z, longueur c, épaisseur e, largeur w)
+        if dynode_idx < dynodes.shape[0]:
+            dx0, dy0, dz0, dc, de, dw = dynodes[dynode_idx]
+            if dx0 <= x <= dx0 + dc and dy0 <= y <= dy0 + de and dz0 <= z <= dz0 + dw:
+                direction = -1.0 if vy > 0 else 1.0
+                y += direction * rebond_pixels
+                vy = 0.0
+                impacts[dynode_idx] = step + 1
+                dynode_idx += 1
+
+        positions[n, 0] = x
+        positions[n, 1] = y
+        positions[n, 2] = z
+        n += 1
+    return n, dynode_idx
+
+
+def trajectoire_euler_3d(Ex, Ey, Ez, x0, y0, z0, vx0, vy0, vz0, dt, nb_steps, k_acc,
+                         borner=True, dynodes=None, rebond_pixels=0.0, details=False):
+    # Version 3D de trajectoire_euler : positions (n, 3) en pixels (x, y, z).
+    # Les champs peuvent rester en float32 / projetés en mémoire : ils ne
+    # sont pas recopiés (np.asarray ne fait qu'une vue). dynodes : dicts {'x', 'y', 'z', 'c', 'e', 'w'} ou
+    # tableau (K, 6).
+    if dynodes is None:
+        dynodes = np.zeros((0, 6))
+    elif len(dynodes) and isinstance(dynodes[0], dict):
+        dynodes = np.array([[d['x'], d['y'], d['z'], d['c'], d['e'], d['w']] for d in dynodes],
+                           dtype=float)
+    positions = np.empty((nb_steps + 1, 3))
+    impacts = -np.ones(len(dynodes), dtype=np.int64)
+    with telemetrie.etape("integration"):
+        n, touchees = _pousser_3d(np.asarray(Ex), np.asarray(Ey), np.asarray(Ez),
+                                  float(x0), float(y0), float(z0),
+                                  float(vx0), float(vy0), float(vz0), float(dt), int(nb_steps),
+                                  float(k_acc), bool(borner), np.asarray(dynodes, dtype=float),
+                                  float(rebond_pixels), positions, impacts)
+        telemetrie.compter("pas_trajectoire", n - 1)
+        telemetrie.compter("appels_interpolation", n - 1)
+    if details:
+        return positions[:n], touchees, np.where(impacts >= 0, impacts * dt, np.nan)
+    return positions[:n]
@@ -0,0 +1,264 @@
+import functools
+import itertools
+import numpy as np
+from Outils_dossier.solveurs import masque_dirichlet, noter, produit_scalaire
+
+
+# ===============================
+# Paramètres du multigrille
+# ===============================
+taille_min = 5        # Arrêt du grossissement quand une dimension tombe sous cette taille
+nu_pre, nu_post = 2, 2  # Lissages avant / après correction grossière
+sweeps_grossier = 200   # Lissages sur le niveau le plus grossier
+
+
+# ===============================
+# Indexation en dimension quelconque
+# ===============================
+# Tout le module travaille sur des grilles 2D (Ny, Nx) ou 3D (Nz, Ny, Nx)
+def interieur(nd):
+    return (slice(1, -1),) * nd
+
+
+@functools.lru_cache(maxsize=None)
+def voisins(nd):
+    # Indices des 2 x nd voisins des cases intérieures (axe par axe, + puis -)
+    idx = []
+    for axe in range(nd):
+        for decalage in (slice(2, None), slice(None, -2)):
+            v = list(interieur(nd))
+            v[axe] = decalage
+            idx.append(tuple(v))
+    return idx
+
+
+def somme_voisins(u):
+    idx = voisins(u.ndim)
+    s = u[idx[0]] + u[idx[1]]
+    for v in idx[2:]:
+        s += u[v]
+    return s
+
+
+def coins(nd):
+    # Décalages (0/1 par axe) des cases fines d'un bloc 2 x 2 (x 2)
+    return list(itertools.product((0, 1), repeat=nd))
+
+
+# ===============================
+# Transferts entre niveaux
+# ===============================
+def taille_grossiere(n):
+    # La case grossière I correspond à la case fine 2I ; si n est pair, la
+    # dernière case grossière tombe hors de la grille fine (bord fixé)
+    return n // 2 + 1
+
+
+def blocs_fins(a, remplissage):
+    # Grille fine complétée jusqu'à 2 x taille_grossiere dans chaque direction
+    bloc = np.full(tuple(2 * taille_grossiere(n) for n in a.shape), remplissage, dtype=a.dtype)
+    bloc[tuple(slice(0, n) for n in a.shape)] = a
+    return bloc
+
+
+def sous_bloc(bloc, coin):
+    return bloc[tuple(slice(c, None, 2) for c in coin)]
+
+
+def bords(a):
+    for axe in range(a.ndim):
+        idx = [slice(None)] * a.ndim
+        for k in (0, -1):
+            idx[axe] = k
+            yield tuple(idx)
+
+
+def restreindre_masque(fixe):
+    # Une case grossière est fixée si l'une des cases fines du bloc 2x2 l'est :
+    # une dynode fine ne disparaît jamais en grossissant la grille
+    bloc = blocs_fins(fixe, True)
+    grossier = np.zeros(tuple(n // 2 for n in bloc.shape), dtype=bool)
+    for coin in coins(fixe.ndim):
+        grossier |= sous_bloc(bloc, coin)
+    for bord in bords(grossier):
+        grossier[bord] = True
+    return grossier
+
+
+def restreindre_valeurs(V, fixe):
+    # Valeur imposée d'une case grossière : moyenne des cases fines fixées du bloc
+    somme = blocs_fins(np.where(fixe, V, 0.0), 0.0)
+    nombre = blocs_fins(fixe.astype(V.dtype), 0.0)
+    s = sum(sous_bloc(somme, coin) for coin in coins(V.ndim))
+    n = sum(sous_bloc(nombre, coin) for coin in coins(V.ndim))
+    return np.divide(s, n, out=np.zeros_like(s), where=n > 0)
+
+
+def restreindre(r):
+    # Pondération complète ((1 2 1) / 4 dans chaque direction) centrée sur les
+    # cases paires
+    # Après le filtrage d'un axe, seules les cases intérieures de cet axe restent
+    somme = np.pad(r, 1)
+    for axe in range(r.ndim):
+        n = somme.shape[axe]
+        gauche = np.take(somme, range(0, n - 2), axis=axe)
+        centre = np.take(somme, range(1, n - 1), axis=axe)
+        droite = np.take(somme, range(2, n), axis=axe)
+        somme = (gauche + 2 * centre + droite) / 4
+    grossier = np.zeros(tuple(taille_grossiere(n) for n in r.shape), dtype=r.dtype)
+    echant = somme[(slice(0, None, 2),) * r.ndim]
+    grossier[tuple(slice(0, n) for n in echant.shape)] = echant
+    return grossier
+
+
+def prolonger(e, shape):
+    # Interpolation (bi/tri)linéaire de la grille grossière vers la grille
+    # fine, un axe après l'autre en commençant par le dernier
+    fin = e
+    for axe in reversed(range(e.ndim)):
+        n = shape[axe]
+        forme = list(fin.shape)
+        forme[axe] = n
+        tmp = np.empty(forme, dtype=e.dtype)
+        pairs = [slice(None)] * e.ndim
+        impairs = [slice(None)] * e.ndim
+        pairs[axe], impairs[axe] = slice(0, None, 2), slice(1, None, 2)
+        tmp[tuple(pairs)] = np.take(fin, range((n + 1) // 2), axis=axe)
+        milieux = 0.5 * (np.take(fin, range(fin.shape[axe] - 1), axis=axe)
+                         + np.take(fin, range(1, fin.shape[axe]), axis=axe))
+        tmp[tuple(impairs)] = np.take(milieux, range(n // 2), axis=axe)
+        fin = tmp
+    return fin
+
+
+# ===============================
+# Lissage et résidu (opérateur -Laplacien / h²)
+# ===============================
+def damiers(libre):
+    parite = sum(np.indices(libre.shape)) % 2
+    return (libre & (parite == 0)), (libre & (parite == 1))
+
+
+def lisser(u, f, h, couleurs, nb_sweeps):
+    # Gauss-Seidel rouge-noir sur les cases libres
+    nd = u.ndim
+    dedans = u[interieur(nd)]
+    source = h * h * f[interieur(nd)]
+    for _ in range(nb_sweeps):
+        for couleur in couleurs:
+            gs = somme_voisins(u)
+            gs += source
+            gs /= 2 * nd
+            np.copyto(dedans, gs, where=couleur)
+
+
+def residu(u, f, h, libre):
+    nd = u.ndim
+    r = np.zeros_like(u)
+    r[interieur(nd)] = f[interieur(nd)] - (
+        2 * nd * u[interieur(nd)] - somme_voisins(u)
+    ) / (h * h)
+    r[~libre] = 0.0
+    return r
+
+
+# ===============================
+# Hiérarchie de grilles
+# ===============================
+def construire_niveaux(fixe):
+    niveaux = []
+    h = 1.0
+    while True:
+        libre = ~fixe
+        niveaux.append({'fixe': fixe, 'h': h,
+                        'couleurs': damiers(libre[interieur(fixe.ndim)])})
+        if min(fixe.shape) <= taille_min:
+            break
+        fixe = restreindre_masque(fixe)
+        h *= 2
+    return niveaux
+
+
+def v_cycle(niveaux, k, u, f):
+    niv = niveaux[k]
+    if k == len(niveaux) - 1:
+        lisser(u, f, niv['h'], niv['couleurs'], sweeps_grossier)
+        return
+    lisser(u, f, niv['h'], niv['couleurs'], nu_pre)
+    r = residu(u, f, niv['h'], ~niv['fixe'])
+    f_c = restreindre(r)
+    f_c[niveaux[k + 1]['fixe']] = 0.0
+    e_c = np.zeros_like(f_c)
+    v_cycle(niveaux, k + 1, e_c, f_c)
+    e = prolonger(e_c, u.shape)
+    u += np.where(niv['fixe'], 0.0, e)
+    # Ordre inversé (noir puis rouge) : le cycle reste symétrique pour le GC
+    lisser(u, f, niv['h'], niv['couleurs'][::-1], nu_post)
+
+
+def fmg(niveaux, k, u):
+    # Multigrille complet : on résout d'abord le problème grossier (valeurs
+    # des dynodes restreintes) pour obtenir le point de départ du niveau k
+    if k == len(niveaux) - 1:
+        lisser(u, np.zeros_like(u), niveaux[k]['h'], niveaux[k]['couleurs'], sweeps_grossier)
+        return
+    fixe = niveaux[k]['fixe']
+    u_c = restreindre_valeurs(u, fixe)
+    fmg(niveaux, k + 1, u_c)
+    np.copyto(u, prolonger(u_c, u.shape), where=~fixe)
+    v_cycle(niveaux, k, u, np.zeros_like(u))
+
+
+# ===============================
+# Solveur multigrille (même interface que relaxation)
+# ===============================
+def laplacien(u, libre):
+    # Opérateur -Laplacien discret (h = 1) restreint aux cases libres
+    nd = u.ndim
+    Au = np.zeros_like(u)
+    Au[interieur(nd)] = 2 * nd * u[interieur(nd)] - somme_voisins(u)
+    Au[~libre] = 0.0
+    return Au
+
+
+def relaxation_multigrille(V, init_conditions, tol=1e-3, max_iter=10000):
+    # Les niveaux grossiers ne voient les dynodes qu'approximativement (masque
+    # restreint) : le V-cycle seul converge lentement (facteur ~0.5). On
+    # l'utilise donc comme préconditionneur d'un gradient conjugué, dont
+    # l'opérateur fin traite exactement les dynodes.
+    V = init_conditions(V)
+    niveaux = construire_niveaux(masque_dirichlet(init_conditions, V.shape))
+    libre = ~niveaux[0]['fixe']
+
+    # Point de départ par multigrille complet (FMG)
+    fmg(niveaux, 0, V)
+
+    def preconditionner(r):
+        z = np.zeros_like(r)
+        v_cycle(niveaux, 0, z, r)
+        z[~libre] = 0.0
+        return z
+
+    r = -laplacien(V, libre)
+    z = preconditionner(r)
+    p = z.copy()
+    rz = produit_scalaire(r, z)
+
+    diff = tol + 1
+    iterations = 0
+    while diff > tol and iterations < max_iter:
+        Ap = laplacien(p, libre)
+        alpha = rz / produit_scalaire(p, Ap)
+        V += alpha * p
+        r -= alpha * Ap
+        diff = float(np.max(np.abs(alpha * p)))
+        iterations += 1
+
+        z = preconditionner(r)
+        rz, rz_old = produit_scalaire(r, z), rz
+        p = z + (rz / rz_old) * p
+
+    noter("multigrille", iterations, diff)
+    print(f"Convergence atteinte en {iterations} itérations "
+          f"(multigrille + GC, {len(niveaux)} niveaux, diff = {diff:.2e})")
+    return V
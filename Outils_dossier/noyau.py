@@ -0,0 +1,79 @@
+import time
+import numpy as np
+from Outils_dossier.solveurs import masque_dirichlet, noter, produit_scalaire
+
+
+# ===============================
+# Jacobi sans allocation dans la boucle
+# ===============================
+def relaxation_instrumentee(V, init_conditions, tol=1e-3, max_iter=10000, tous_les=10):
+    # Même itération que relaxation (Jacobi), mais :
+    #  - deux grilles préallouées échangées à chaque balayage ;
+    #  - tous les calculs écrivent dans des tampons (out=) ;
+    #  - les conditions aux limites sont un seul np.copyto sur un masque
+    #    calculé une fois, au lieu de rappeler init_conditions ;
+    #  - le critère d'arrêt n'est évalué que tous les `tous_les` balayages.
+    # Renvoie (V, stats) ; stats contient l'historique aux balayages vérifiés.
+    t0 = time.perf_counter()
+    V = init_conditions(V)
+    fixe = masque_dirichlet(init_conditions, V.shape)
+    # Valeurs imposées dans le type de V (np.where avec 0.0 passerait en float64)
+    valeurs = np.zeros_like(V)
+    np.copyto(valeurs, V, where=fixe)
+    fixe_interieur = fixe[1:-1, 1:-1]
+
+    ancien = V
+    nouveau = V.copy()
+    # Tampons de calcul en float64 même si V est en float32 (précision mixte)
+    somme = np.empty(V[1:-1, 1:-1].shape)
+    ecart = np.empty_like(somme)
+
+    stats = {
+        'iterations': 0,
+        'tous_les': tous_les,
+        'iterations_verifiees': [],
+        'diff': [],
+        'residu': [],
+    }
+
+    diff = tol + 1
+    iterations = 0
+    while diff > tol and iterations < max_iter:
+        np.add(ancien[2:, 1:-1], ancien[:-2, 1:-1], out=somme)
+        np.add(somme, ancien[1:-1, 2:], out=somme)
+        np.add(somme, ancien[1:-1, :-2], out=somme)
+        np.multiply(somme, 0.25, out=nouveau[1:-1, 1:-1])
+        np.copyto(nouveau, valeurs, where=fixe)
+        iterations += 1
+
+        if iterations % tous_les == 0 or iterations == max_iter:
+            np.subtract(nouveau[1:-1, 1:-1], ancien[1:-1, 1:-1], out=ecart)
+            np.abs(ecart, out=ecart)
+            diff = float(ecart.max())
+            # Résidu de Laplace (4V - somme des voisins) sur les cases libres,
+            # calculé sur l'ancienne grille : c'est 4 x la correction Jacobi
+            np.multiply(ancien[1:-1, 1:-1], 4.0, out=ecart)
+            np.subtract(ecart, somme, out=ecart)
+            np.copyto(ecart, 0.0, where=fixe_interieur)
+            stats['iterations_verifiees'].append(iterations)
+            stats['diff'].append(diff)
+            stats['residu'].append(np.sqrt(produit_scalaire(ecart, ecart)))
+
+        ancien, nouveau = nouveau, ancien
+
+    if ancien is not V:
+        np.copyto(V, ancien)
+
+    stats['iterations'] = iterations
+    stats['temps'] = time.perf_counter() - t0
+    stats['diff'] = np.array(stats['diff'])
+    stats['residu'] = np.array(stats['residu'])
+    stats['iterations_verifiees'] = np.array(stats['iterations_verifiees'])
+    noter("jacobi_tampons", iterations, diff)
+    print(f"Convergence atteinte en {iterations} itérations "
+          f"(Jacobi sans allocation, diff = {diff:.2e})")
+    return V, stats
+
+
+def relaxation_jacobi_tampons(V, init_conditions, tol=1e-3, max_iter=10000):
+    return relaxation_instrumentee(V, init_conditions, tol, max_iter)[0]
@@ -0,0 +1,138 @@
+import time
+import numpy as np
+from scipy import ndimage
+from scipy.optimize import differential_evolution
+from Outils_dossier.cache import champs_en_cache
+from Outils_dossier.geometrie import Geometrie
+from Outils_dossier.solveurs import resoudre
+from Outils_dossier.jit import trajectoire_euler
+
+# ===============================
+# Paramètres de la recherche
+# ===============================
+scale = 10           # 1 mm = 10 cases
+e_mm = 0.4           # Épaisseur dynode (fixe, comme Q1_pour3c)
+N = 4                # Nombre de dynodes
+rebond_mm = 2.0      # Rebond des questions 3c/3d
+
+# Bornes (mm) de a, b, c, d, f ; b est l'espace dynode-paroi (en y)
+noms = ("a", "b", "c", "d", "f")
+bornes = [(1.0, 5.0), (1.0, 5.0), (3.0, 10.0), (1.0, 10.0), (6.0, 14.0)]
+reference = (2.25, 3.23, 8.0, 6.8, 10.86)  # Réglage manuel de Q1_pour3c
+
+# Constantes physiques et intégration (comme Q3_c)
+e_charge = -1.602e-19
+m = 9.109e-31
+dt = 3e-11
+duree_totale = 3e-7
+
+
+# ===============================
+# Géométrie paramétrée (même construction que Q1_pour3c)
+# ===============================
+def geometrie(a_mm, b_mm, c_mm, d_mm, f_mm, N=N, scale=scale, tension=100.0):
+    # Dynodes à b de la paroi, mêmes conversions que Q1_pour3c (a et d
+    # restent réels, positions tronquées) ; deux candidats qui donnent la
+    # même grille partagent la même entrée du cache disque. La k-ième dynode
+    # (k = 1..N) est portée à k * tension volts.
+    g = Geometrie(N, a_mm, b_mm, c_mm, d_mm, e_mm, f_mm, scale=scale, tension=tension)
+    return g.init_conditions, g.shape, g.dynodes
+
+
+# ===============================
+# Évaluation d'un candidat
+# ===============================
+_derniere_solution = {}  # Par processus : dernier potentiel, pour démarrer à chaud
+
+
+def potentiel(init_conditions, shape, methode):
+    V0 = _derniere_solution.get('V')
+    if V0 is not None:
+        zoom = (shape[0] / V0.shape[0], shape[1] / V0.shape[1])
+        V0 = ndimage.zoom(V0, zoom, order=1, grid_mode=True, mode="nearest")[:shape[0], :shape[1]]
+        if V0.shape != shape:
+            V0 = None
+
+    def relaxation(V, tol=1e-3, methode=methode):
+        return resoudre(V, init_conditions, tol, 10000, methode)
+
+    def champ(V):
+        Ey, Ex = np.gradient(-V, 1 / scale, 1 / scale)
+        return Ex, Ey
+
+    V, Ex, Ey = champs_en_cache(init_conditions, relaxation, shape, scale, champ,
+                                methode=methode, V_initial=V0)
+    _derniere_solution['V'] = np.asarray(V)
+    return V, Ex, Ey
+
+
+def evaluer(params, objectif="ordre", methode="sor", nb_electrons=8):
+    # Renvoie la quantité à minimiser :
+    #  - "ordre" : -(dynodes touchées dans l'ordre), départage par le temps de transit ;
+    #  - "collection" : -(fraction d'électrons, départs répartis sur ±1 mm,
+    #    qui touchent les N dynodes dans l'ordre) ;
+    #  - "transit" : temps de transit (s) si les N dynodes sont touchées, sinon pénalité.
+    init_conditions, shape, dynodes = geometrie(*params)
+    V, Ex, Ey = potentiel(init_conditions, shape, methode)
+    k_acc = (e_charge / m) * scale * 1e3
+    nb_steps = int(duree_totale / dt)
+
+    departs = [shape[0] / 2]
+    if objectif == "collection":
+        departs = shape[0] / 2 + np.linspace(-1, 1, nb_electrons) * scale
+
+    resultats = []
+    for y0 in departs:
+        _, touchees, instants = trajectoire_euler(Ex, Ey, 0.0, y0, 0.0, 0.0, dt, nb_steps, k_acc,
+                                                  dynodes=dynodes, rebond_pixels=rebond_mm * scale,
+                                                  details=True)
+        # Temps de transit : impact sur la dernière dynode touchée (l'électron,
+        # borné à la grille, n'en sort jamais : la durée simulée est constante)
+        resultats.append((touchees, float(instants[touchees - 1]) if touchees else duree_totale))
+
+    if objectif == "collection":
+        return -np.mean([t == N for t, _ in resultats])
+    touchees, transit = resultats[0]
+    if objectif == "transit":
+        return transit if touchees == N else duree_totale * (1 + N - touchees)
+    return -touchees + transit / duree_totale
+
+
+# ===============================
+# Recherche (évolution différentielle, candidats évalués en parallèle)
+# ===============================
+def optimiser(objectif="ordre", methode="sor", nb_processus=1, max_generations=15,
+              taille_population=6, graine=0):
+    journal = []
+    t0 = time.perf_counter()
+
+    def suivre(intermediate_result):
+        xk, valeur = intermediate_result.x, intermediate_result.fun
+        journal.append({'generation': len(journal) + 1, 'params': np.array(xk),
+                        'valeur': valeur, 'temps': time.perf_counter() - t0})
+        print(f"  génération {len(journal):3d} : {valeur:+.4f}  "
+              + ", ".join(f"{n} = {v:.2f}" for n, v in zip(noms, xk)))
+
+    res = differential_evolution(
+        evaluer, bornes, args=(objectif, methode), x0=reference,
+        popsize=taille_population, maxiter=max_generations, seed=graine, polish=False,
+        workers=nb_processus, updating="deferred" if nb_processus > 1 else "immediate",
+        callback=suivre,
+    )
+
+    meilleur = dict(zip(noms, res.x))
+    print("\n=== Meilleure géométrie trouvée ===")
+    for n, v in meilleur.items():
+        print(f"{n} : {v:.2f} mm")
+    print(f"objectif {objectif} : {res.fun:+.4f} "
+          f"(réglage manuel : {evaluer(reference, objectif, methode):+.4f}), "
+          f"{res.nfev} évaluations")
+    return {'params': meilleur, 'valeur': res.fun, 'journal': journal, 'resultat': res}
+
+
+def main():
+    optimiser()
+
+
+if __name__ == "__main__":
+    main()
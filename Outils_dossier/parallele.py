@@ -0,0 +1,142 @@
+import multiprocessing
+import os
+import time
+import numpy as np
+from multiprocessing import shared_memory
+from Outils_dossier.solveurs import demi_pas_sor, masque_dirichlet, noter, omega_optimal
+
+
+# ===============================
+# Paramètres de la relaxation parallèle
+# ===============================
+# PM_PROCESSUS fixe le nombre de processus (par défaut : un par cœur)
+nb_processus_defaut = int(os.environ.get("PM_PROCESSUS", os.cpu_count() or 1))
+lignes_min = 8  # Hauteur minimale d'une bande
+
+
+# ===============================
+# Découpage en bandes
+# ===============================
+def bandes(Ny, nb):
+    # Lignes intérieures 1..Ny-2 réparties en nb bandes de hauteurs voisines
+    nb = max(1, min(nb, (Ny - 2) // lignes_min))
+    bornes = np.linspace(1, Ny - 1, nb + 1).round().astype(int)
+    return list(zip(bornes[:-1], bornes[1:]))
+
+
+# ===============================
+# Processus de calcul : SOR rouge-noir sur une bande
+# ===============================
+def _travailleur(noms, shape, dtype, j0, j1, omega, tol, max_iter, barriere, diffs, rang,
+                 iterations):
+    # V et le masque sont en mémoire partagée. La bande possède les lignes
+    # j0..j1-1 ; les lignes j0-1 et j1 (halo) appartiennent aux voisines et
+    # sont relues après chaque barrière : c'est l'échange des halos. Une
+    # couleur ne lit que des cases de l'autre couleur, donc chaque demi-pas
+    # est identique à celui de relaxation_sor.
+    shm_V, shm_fixe = (shared_memory.SharedMemory(name=nom) for nom in noms)
+    V = np.ndarray(shape, dtype=dtype, buffer=shm_V.buf)
+    fixe = np.ndarray(shape, dtype=bool, buffer=shm_fixe.buf)
+
+    bloc = V[j0 - 1:j1 + 1]
+    libre = ~fixe[j0:j1, 1:-1]
+    jj, ii = np.indices(libre.shape)
+    rouge = libre & ((ii + jj + j0 - 1) % 2 == 0)  # Même parité globale que relaxation_sor
+    noir = libre & ((ii + jj + j0 - 1) % 2 == 1)
+    tampon = np.empty(libre.shape)
+
+    diff = tol + 1
+    n = 0
+    while diff > tol and n < max_iter:
+        diff_locale = 0.0
+        for couleur in (rouge, noir):
+            diff_locale = max(diff_locale, demi_pas_sor(bloc, couleur, omega, tampon))
+            barriere.wait()
+        # Réduction collective : chaque bande dépose son écart, toutes lisent
+        # le maximum après la barrière (l'écriture suivante n'a lieu qu'après
+        # la barrière rouge de l'itération suivante, donc après toutes les lectures)
+        diffs[rang] = diff_locale
+        barriere.wait()
+        diff = max(diffs)
+        n += 1
+
+    if rang == 0:
+        iterations.value = n
+    del bloc, V, fixe
+    shm_V.close()
+    shm_fixe.close()
+
+
+# ===============================
+# Relaxation parallèle (même interface que les autres solveurs)
+# ===============================
+def relaxation_parallele(V, init_conditions, tol=1e-3, max_iter=10000, nb_processus=None):
+    Ny, Nx = V.shape
+    omega = omega_optimal(Ny, Nx)
+    V = init_conditions(V)
+    decoupage = bandes(Ny, nb_processus or nb_processus_defaut)
+
+    shm_V = shared_memory.SharedMemory(create=True, size=V.nbytes)
+    shm_fixe = shared_memory.SharedMemory(create=True, size=V.size)
+    try:
+        V_partage = np.ndarray(V.shape, dtype=V.dtype, buffer=shm_V.buf)
+        V_partage[:] = V
+        fixe = np.ndarray(V.shape, dtype=bool, buffer=shm_fixe.buf)
+        fixe[:] = masque_dirichlet(init_conditions, V.shape)
+
+        barriere = multiprocessing.Barrier(len(decoupage))
+        diffs = multiprocessing.Array("d", len(decoupage), lock=False)
+        iterations = multiprocessing.Value("i", 0, lock=False)
+        processus = [
+            multiprocessing.Process(target=_travailleur, args=(
+                (shm_V.name, shm_fixe.name), V.shape, V.dtype, j0, j1, omega, tol, max_iter,
+                barriere, diffs, rang, iterations))
+            for rang, (j0, j1) in enumerate(decoupage)]
+        for p in processus:
+            p.start()
+        for p in processus:
+            p.join()
+        if any(p.exitcode != 0 for p in processus):
+            raise RuntimeError("Relaxation parallèle : un processus de calcul a échoué")
+
+        V[:] = V_partage
+        diff = max(diffs)
+        del V_partage, fixe
+    finally:
+        for shm in (shm_V, shm_fixe):
+            shm.close()
+            shm.unlink()
+
+    noter("parallele", iterations.value, diff)
+    print(f"Convergence atteinte en {iterations.value} itérations (SOR rouge-noir, "
+          f"{len(decoupage)} processus, omega = {omega:.3f}, diff = {diff:.2e})")
+    return V
+
+
+# ===============================
+# Passage à l'échelle sur le tube fin à 12 dynodes
+# ===============================
+def main(scale=20, tol=1e-3):
+    from Outils_dossier.geometrie import tube
+    from Outils_dossier.solveurs import relaxation_sor
+    g = tube(12, scale=scale)
+    print(f"Grille {g.Ny} x {g.Nx}, {os.cpu_count()} cœur(s)")
+
+    t0 = time.perf_counter()
+    V_serie = relaxation_sor(g.init_conditions(np.zeros(g.shape)), g.init_conditions, tol, 100000)
+    temps_serie = time.perf_counter() - t0
+    print(f"  série        : {temps_serie:7.2f} s")
+
+    nb = 1
+    while nb <= (os.cpu_count() or 1):
+        t0 = time.perf_counter()
+        V = relaxation_parallele(g.init_conditions(np.zeros(g.shape)), g.init_conditions, tol,
+                                 100000, nb_processus=nb)
+        temps = time.perf_counter() - t0
+        print(f"  {nb:3d} processus : {temps:7.2f} s (accélération {temps_serie / temps:.2f}), "
+              f"|V - V_série| max = {np.max(np.abs(V - V_serie)):.2e}")
+        nb *= 2
+
+
+if __name__ == "__main__":
+    main()
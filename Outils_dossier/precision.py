@@ -0,0 +1,104 @@
+import json
+import time
+import numpy as np
+from Outils_dossier.solveurs import derniere_resolution, resoudre, type_flottant
+from Outils_dossier.geometrie import tube
+from Outils_dossier.interpolation import EchantillonneurChamp
+from Outils_dossier.jit import trajectoire_euler
+
+# ===============================
+# Paramètres de la comparaison (tracé comme Q3_c)
+# ===============================
+e_charge = -1.602e-19
+m = 9.109e-31
+dt = 3e-11
+duree_totale = 3e-7
+rebond_mm = 2.0
+decalages_mm = (-0.5, 0.0, 0.5)  # Départs autour du centre du tube
+
+
+# ===============================
+# Une résolution complète dans une précision donnée
+# ===============================
+def executer(geometrie, methode, precision, tol=1e-3):
+    dtype = type_flottant(precision)
+    t0 = time.perf_counter()
+    V = geometrie.init_conditions(np.zeros(geometrie.shape, dtype))
+    V = resoudre(V, geometrie.init_conditions, tol, 100000, methode)
+    temps = time.perf_counter() - t0
+    Ex, Ey = geometrie.calcul_champ_electrique(V)
+    table = EchantillonneurChamp(Ex, Ey).E
+
+    scale = geometrie.scale
+    k_acc = (e_charge / m) * scale * 1e3
+    trajectoires = []
+    for dy in decalages_mm:
+        positions, touchees, instants = trajectoire_euler(
+            Ex, Ey, 0.0, geometrie.Ny / 2 + dy * scale, 0.0, 0.0, dt, int(duree_totale / dt),
+            k_acc, dynodes=geometrie.dynodes, rebond_pixels=rebond_mm * scale, details=True)
+        trajectoires.append({'positions': positions / scale, 'touchees': touchees,
+                             'transit': instants[-1]})
+    return {'V': V, 'Ex': Ex, 'Ey': Ey, 'trajectoires': trajectoires,
+            'iterations': derniere_resolution.get('iterations', -1), 'temps': temps,
+            'octets': V.nbytes + Ex.nbytes + Ey.nbytes + table.nbytes}
+
+
+def ecart_trajectoire(a, b):
+    # Écart maximal (mm) sur la partie commune des deux trajectoires
+    n = min(len(a), len(b))
+    return float(np.max(np.hypot(*(a[:n] - b[:n]).T)))
+
+
+# ===============================
+# Rapport float32 / float64
+# ===============================
+def comparer(geometrie, methodes=("sor", "multigrille", "jacobi_tampons"), tol=1e-3,
+             fichier=None):
+    rapport = []
+    for methode in methodes:
+        ref = executer(geometrie, methode, "float64", tol)
+        f32 = executer(geometrie, methode, "float32", tol)
+        E_ref = np.hypot(ref['Ex'], ref['Ey'])
+        ligne = {
+            'methode': methode,
+            'iterations_float64': ref['iterations'],
+            'iterations_float32': f32['iterations'],
+            'temps_float64': ref['temps'],
+            'temps_float32': f32['temps'],
+            'octets_float64': ref['octets'],
+            'octets_float32': f32['octets'],
+            'ecart_V': float(np.max(np.abs(f32['V'] - ref['V']))),
+            'ecart_E_relatif': float(np.max(np.hypot(f32['Ex'] - ref['Ex'], f32['Ey'] - ref['Ey']))
+                                     / E_ref.max()),
+            'ecart_trajectoire_mm': max(ecart_trajectoire(a['positions'], b['positions'])
+                                        for a, b in zip(ref['trajectoires'], f32['trajectoires'])),
+            'memes_dynodes': all(a['touchees'] == b['touchees']
+                                 for a, b in zip(ref['trajectoires'], f32['trajectoires'])),
+            'ecart_transit': float(np.nanmax(np.abs(
+                [a['transit'] - b['transit'] for a, b in zip(ref['trajectoires'], f32['trajectoires'])]
+                + [0.0]))),
+        }
+        rapport.append(ligne)
+
+    print(f"\n=== float32 / float64 : grille {geometrie.Ny} x {geometrie.Nx}, N = {geometrie.N} ===")
+    print(f"{'méthode':>15s} {'itérations':>13s} {'mémoire (Mo)':>15s} {'|dV| max':>10s} "
+          f"{'|dE|/|E|':>9s} {'traj. (mm)':>10s} {'dynodes':>8s}")
+    for l in rapport:
+        print(f"{l['methode']:>15s} {l['iterations_float64']:>6d}/{l['iterations_float32']:<6d} "
+              f"{l['octets_float64'] / 1e6:>7.2f}/{l['octets_float32'] / 1e6:<7.2f} "
+              f"{l['ecart_V']:>10.2e} {l['ecart_E_relatif']:>9.2e} "
+              f"{l['ecart_trajectoire_mm']:>10.2e} {'identiques' if l['memes_dynodes'] else 'DIFFÉRENTES':>8s}")
+
+    if fichier is not None:
+        with open(fichier, "w") as f:
+            json.dump(rapport, f, indent=2)
+    return rapport
+
+
+def main():
+    for N in (4, 12):
+        comparer(tube(N))
+
+
+if __name__ == "__main__":
+    main()
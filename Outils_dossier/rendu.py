@@ -0,0 +1,131 @@
+import atexit
+import concurrent.futures
+import hashlib
+import os
+import time
+import numpy as np
+import matplotlib
+from Outils_dossier import telemetrie
+
+
+# ===============================
+# Mode sans affichage
+# ===============================
+# PM_HEADLESS=1 force le rendu sans fenêtre (backend Agg, jamais de
+# plt.show bloquant), PM_HEADLESS=0 l'interdit ; par défaut, il est actif
+# dès que le backend de matplotlib n'est pas interactif (pas d'écran,
+# MPLBACKEND=Agg...). PM_PROCESSUS_RENDU fixe la taille du groupe de processus.
+backends_sans_affichage = {"agg", "cairo", "pdf", "pgf", "ps", "svg", "template"}
+nb_processus_rendu = int(os.environ.get("PM_PROCESSUS_RENDU", os.cpu_count() or 1))
+
+
+def sans_affichage():
+    mode = os.environ.get("PM_HEADLESS")
+    if mode is not None:
+        return mode != "0"
+    return matplotlib.get_backend().lower() in backends_sans_affichage
+
+
+# ===============================
+# Empreinte des données d'une figure
+# ===============================
+def empreinte(chemin, dessin, tableaux, options, dpi):
+    # Tableaux d'entrée, options, résolution et code de la fonction de dessin :
+    # si rien n'a changé, la figure sur disque est à jour
+    h = hashlib.sha1()
+    h.update(repr((os.path.basename(chemin), dessin.__module__, dessin.__qualname__,
+                   sorted(options.items()), dpi)).encode())
+    h.update(dessin.__code__.co_code)
+    h.update(repr(dessin.__code__.co_consts).encode())
+    for tableau in tableaux:
+        tableau = np.asarray(tableau)
+        h.update(repr((tableau.dtype.str, tableau.shape)).encode())
+        h.update(np.ascontiguousarray(tableau).tobytes())
+    return h.hexdigest()
+
+
+def empreinte_sur_disque(chemin):
+    # L'empreinte est rangée dans les métadonnées texte du PNG
+    if not chemin.lower().endswith(".png") or not os.path.exists(chemin):
+        return None
+    from PIL import Image
+    try:
+        with Image.open(chemin) as image:
+            return image.text.get("Empreinte")
+    except (OSError, SyntaxError):
+        return None
+
+
+# ===============================
+# Rendu d'une figure (dans un processus du groupe ou sur place)
+# ===============================
+def _rendre(chemin, dessin, tableaux, options, dpi, cle, afficher=False):
+    import matplotlib.pyplot as plt
+    if not afficher:
+        plt.switch_backend("Agg")
+    t0 = time.perf_counter()
+    dessin(*tableaux, **options)
+    # Fichier temporaire puis renommage : une figure interrompue n'est jamais
+    # prise pour une figure à jour
+    racine, extension = os.path.splitext(chemin)
+    tmp = f"{racine}.{os.getpid()}.tmp{extension}"
+    plt.savefig(tmp, dpi=dpi or "figure",
+                metadata={"Empreinte": cle} if extension.lower() == ".png" else None)
+    os.replace(tmp, chemin)
+    if afficher:
+        plt.show()
+    plt.close("all")
+    return chemin, time.perf_counter() - t0
+
+
+_groupe = None
+_en_cours = []
+
+
+def _groupe_rendu():
+    global _groupe
+    if _groupe is None:
+        _groupe = concurrent.futures.ProcessPoolExecutor(max_workers=nb_processus_rendu)
+    return _groupe
+
+
+def figure(chemin, dessin, *tableaux, dpi=None, **options):
+    # dessin(*tableaux, **options) trace la figure courante sans l'enregistrer
+    # ni l'afficher. Sans affichage : la figure est sautée si son empreinte
+    # est celle du fichier existant, sinon rendue dans un processus du groupe
+    # (attendre() récupère les résultats). Avec affichage : rendu sur place
+    # puis plt.show, comme avant.
+    with telemetrie.etape("rendu"):
+        cle = empreinte(chemin, dessin, tableaux, options, dpi)
+        if not sans_affichage():
+            telemetrie.compter("figures_rendues")
+            return _rendre(chemin, dessin, tableaux, options, dpi, cle, afficher=True)
+        if empreinte_sur_disque(chemin) == cle:
+            telemetrie.compter("figures_inchangees")
+            print(f"Figure inchangée : {chemin}")
+            return None
+        telemetrie.compter("figures_rendues")
+        futur = _groupe_rendu().submit(_rendre, chemin, dessin, tableaux, options, dpi, cle)
+        _en_cours.append(futur)
+        return futur
+
+
+def attendre():
+    # Attend la fin des rendus en cours ; une erreur de rendu est relancée ici
+    global _en_cours
+    en_cours, _en_cours = _en_cours, []
+    for futur in en_cours:
+        chemin, duree = futur.result()
+        telemetrie.compter("rendu_processus_s", duree)
+        print(f"Figure rendue : {chemin} ({duree:.1f} s)")
+
+
+def fermer():
+    global _groupe
+    attendre()
+    if _groupe is not None:
+        _groupe.shutdown()
+        _groupe = None
+
+
+atexit.register(fermer)
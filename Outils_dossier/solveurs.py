@@ -0,0 +1,157 @@
+import importlib
+import time
+import numpy as np
+from Outils_dossier import telemetrie
+
+
+# ===============================
+# Masque des cases imposées (Dirichlet)
+# ===============================
+def masque_dirichlet(init_conditions, shape):
+    # Une Geometrie (Outils_dossier.geometrie) connaît déjà son masque
+    fixe = getattr(getattr(init_conditions, "__self__", None), "fixe", None)
+    if fixe is not None and fixe.shape == tuple(shape):
+        return fixe.copy()
+    # On part d'une grille remplie de NaN : toutes les cases écrites par
+    # init_conditions (bords + dynodes) sont des cases à potentiel imposé
+    V_test = init_conditions(np.full(shape, np.nan))
+    return ~np.isnan(V_test)
+
+
+# ===============================
+# Précision des tableaux
+# ===============================
+# "float32" divise par deux la mémoire de V, du champ et des tables
+# d'interpolation ; les produits scalaires (gradient conjugué, résidus) sont
+# alors accumulés en float64 (précision mixte).
+PRECISIONS = {"float64": np.float64, "float32": np.float32}
+
+
+def type_flottant(precision="float64"):
+    if precision not in PRECISIONS:
+        raise ValueError(f"Précision inconnue : {precision!r} "
+                         f"(disponibles : {', '.join(PRECISIONS)})")
+    return np.dtype(PRECISIONS[precision])
+
+
+def produit_scalaire(a, b):
+    # Accumulé en float64 quel que soit le type des tableaux
+    return float(np.einsum("i,i->", a.ravel(), b.ravel(), dtype=np.float64))
+
+
+# ===============================
+# Bilan de la dernière résolution
+# ===============================
+# Chaque solveur y note son nombre d'itérations et son dernier écart, pour
+# les outils qui enregistrent les performances (balayage, bancs d'essai)
+derniere_resolution = {}
+
+
+def noter(methode, iterations, diff):
+    derniere_resolution.clear()
+    derniere_resolution.update({'methode': methode, 'iterations': int(iterations),
+                                'diff': float(diff)})
+    telemetrie.compter("iterations", int(iterations))
+
+
+# ===============================
+# Facteur de sur-relaxation
+# ===============================
+def omega_optimal(Ny, Nx):
+    # Rayon spectral de Jacobi pour un rectangle Ny x Nx avec bords fixés,
+    # puis omega optimal de la SOR (Young)
+    rho = 0.5 * (np.cos(np.pi / Nx) + np.cos(np.pi / Ny))
+    return 2 / (1 + np.sqrt(1 - rho ** 2))
+
+
+# ===============================
+# SOR rouge-noir
+# ===============================
+def demi_pas_sor(bloc, couleur, omega, tampon):
+    # Met à jour en place les cases `couleur` de l'intérieur de bloc et renvoie
+    # la plus grande correction. Tout passe par `tampon` (float64, de la forme
+    # de l'intérieur) : aucune allocation. La somme des voisins est accumulée
+    # en float64 (en float32, l'arrondi de la somme dépasse tol et la SOR ne
+    # converge plus).
+    interieur = bloc[1:-1, 1:-1]
+    np.add(bloc[2:, 1:-1], bloc[:-2, 1:-1], out=tampon, dtype=np.float64)
+    tampon += bloc[1:-1, 2:]
+    tampon += bloc[1:-1, :-2]
+    tampon *= 0.25
+    tampon -= interieur
+    tampon *= omega
+    tampon *= couleur  # Correction nulle hors de la couleur (plus rapide que where=)
+    interieur += tampon
+    np.abs(tampon, out=tampon)
+    return float(tampon.max()) if tampon.size else 0.0
+
+
+def relaxation_sor(V, init_conditions, tol=1e-3, max_iter=10000, omega=None):
+    Ny, Nx = V.shape
+    if omega is None:
+        omega = omega_optimal(Ny, Nx)
+
+    V = init_conditions(V)
+    libre = ~masque_dirichlet(init_conditions, V.shape)[1:-1, 1:-1]
+
+    # Damier sur les cases intérieures : rouge = (i + j) pair
+    jj, ii = np.indices(libre.shape)
+    rouge = libre & ((ii + jj) % 2 == 0)
+    noir = libre & ((ii + jj) % 2 == 1)
+
+    tampon = np.empty(libre.shape)
+    diff = tol + 1
+    iterations = 0
+
+    while diff > tol and iterations < max_iter:
+        diff = max(demi_pas_sor(V, couleur, omega, tampon) for couleur in (rouge, noir))
+        iterations += 1
+
+    noter("sor", iterations, diff)
+    print(f"Convergence atteinte en {iterations} itérations "
+          f"(SOR rouge-noir, omega = {omega:.3f}, diff = {diff:.2e})")
+    return V
+
+
+# ===============================
+# Choix du solveur
+# ===============================
+# Les solveurs des autres modules sont importés à la demande (évite les
+# imports circulaires, ces modules utilisant masque_dirichlet)
+SOLVEURS = {
+    "sor": "Outils_dossier.solveurs:relaxation_sor",
+    "jacobi_tampons": "Outils_dossier.noyau:relaxation_jacobi_tampons",
+    "jit": "Outils_dossier.jit:relaxation_jit",
+    "multigrille": "Outils_dossier.multigrille:relaxation_multigrille",
+    "creux_lu": "Outils_dossier.creux:relaxation_creux_lu",
+    "creux_gc": "Outils_dossier.creux:relaxation_creux_gc",
+    "parallele": "Outils_dossier.parallele:relaxation_parallele",
+}
+
+
+def resoudre(V, init_conditions, tol=1e-3, max_iter=10000, methode="sor"):
+    if methode not in SOLVEURS:
+        raise ValueError(f"Méthode de relaxation inconnue : {methode!r} "
+                         f"(disponibles : jacobi, {', '.join(SOLVEURS)})")
+    module, fonction = SOLVEURS[methode].split(":")
+    solveur = getattr(importlib.import_module(module), fonction)
+    return solveur(V, init_conditions, tol, max_iter)
+
+
+# Compare les itérations et le temps de chaque méthode sur la même géométrie
+def comparer_methodes(relaxation, init_conditions, shape, tol=1e-3,
+                      methodes=("jacobi", "sor")):
+    # Renvoie {methode: {'temps', 'iterations'}} ; le nombre d'itérations est
+    # celui noté par le solveur (derniere_resolution)
+    resultats = {}
+    for methode in methodes:
+        V = init_conditions(np.zeros(shape))
+        derniere_resolution.clear()
+        t0 = time.perf_counter()
+        relaxation(V, tol=tol, methode=methode)
+        resultats[methode] = {'temps': time.perf_counter() - t0,
+                              'iterations': derniere_resolution.get('iterations', -1)}
+    print(f"  {'méthode':>12s} {'itérations':>10s} {'temps (s)':>10s}")
+    for methode, r in resultats.items():
+        print(f"  {methode:>12s} {r['iterations']:>10d} {r['temps']:>10.3f}")
+    return resultats
@@ -0,0 +1,73 @@
+import numpy as np
+from scipy import ndimage
+from Outils_dossier.solveurs import masque_dirichlet, resoudre
+
+
+# ===============================
+# Repérage des électrodes
+# ===============================
+def electrodes(init_conditions, shape):
+    # Chaque dynode est une composante connexe de cases fixées hors des bords
+    # du tube (les bords, à 0 V, ne contribuent pas). Les électrodes sont
+    # rangées par tension d'origine croissante, donc dans l'ordre des dynodes.
+    fixe = masque_dirichlet(init_conditions, shape)
+    interieur = fixe.copy()
+    interieur[0, :] = interieur[-1, :] = interieur[:, 0] = interieur[:, -1] = False
+    etiquettes, nb = ndimage.label(interieur)
+
+    V_ref = init_conditions(np.zeros(shape))
+    tensions = np.array([V_ref[etiquettes == k][0] for k in range(1, nb + 1)])
+    ordre = np.argsort(tensions, kind="stable")
+    renumerotation = np.zeros(nb + 1, dtype=int)
+    renumerotation[ordre + 1] = np.arange(1, nb + 1)
+    return renumerotation[etiquettes], tensions[ordre], fixe
+
+
+# ===============================
+# Base : une solution par électrode à 1 V
+# ===============================
+def construire_base(init_conditions, shape, calcul_champ_electrique,
+                    tol=1e-3, methode="creux_lu"):
+    # Laplace est linéaire : V(tensions) = somme_k tensions[k] * V_k, où V_k
+    # vaut 1 V sur l'électrode k et 0 V sur toutes les autres. Avec
+    # methode="creux_lu", la factorisation est partagée par toutes les V_k.
+    etiquettes, tensions, fixe = electrodes(init_conditions, shape)
+    nb = len(tensions)
+    base = {
+        'V': np.empty((nb,) + shape),
+        'Ex': np.empty((nb,) + shape),
+        'Ey': np.empty((nb,) + shape),
+        'etiquettes': etiquettes,
+        'tensions': tensions,
+    }
+
+    for k in range(nb):
+        unite = (etiquettes == k + 1).astype(float)
+
+        def init_unitaire(V):
+            np.copyto(V, unite, where=fixe)
+            return V
+
+        V_k = resoudre(np.zeros(shape), init_unitaire, tol=tol, methode=methode)
+        base['V'][k] = V_k
+        base['Ex'][k], base['Ey'][k] = calcul_champ_electrique(V_k)
+
+    return base
+
+
+# ===============================
+# Recombinaison pour un jeu de tensions
+# ===============================
+def combiner(base, tensions=None):
+    # tensions : une valeur par électrode (ordre de base['tensions']) ; par
+    # défaut, les tensions codées dans init_conditions
+    if tensions is None:
+        tensions = base['tensions']
+    tensions = np.asarray(tensions, dtype=float)
+    if tensions.shape != base['tensions'].shape:
+        raise ValueError(f"{len(base['tensions'])} tensions attendues, "
+                         f"{tensions.size} reçues")
+    V = np.tensordot(tensions, base['V'], axes=1)
+    Ex = np.tensordot(tensions, base['Ex'], axes=1)
+    Ey = np.tensordot(tensions, base['Ey'], axes=1)
+    return V, Ex, Ey
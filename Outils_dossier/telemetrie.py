@@ -0,0 +1,138 @@
+import cProfile
+import csv
+import json
+import os
+import re
+import time
+import tracemalloc
+
+# ===============================
+# Activation (désactivée par défaut)
+# ===============================
+# PM_TELEMETRIE=1 active les chronomètres et compteurs par étape ; le rapport
+# est écrit dans <PM_TELEMETRIE_SORTIE>.json et .csv (par défaut
+# "telemetrie"). PM_TELEMETRIE_PROFIL=1 ajoute un profil cProfile par étape
+# de premier niveau (<sortie>_<étape>.prof). Le suivi du pic mémoire
+# (tracemalloc) ralentit les allocations Python : PM_TELEMETRIE_MEMOIRE=0 le
+# coupe. Désactivée, chaque point de mesure ne coûte qu'un test sur `actif`.
+actif = os.environ.get("PM_TELEMETRIE", "0") not in ("", "0")
+profil = os.environ.get("PM_TELEMETRIE_PROFIL", "0") not in ("", "0")
+memoire = os.environ.get("PM_TELEMETRIE_MEMOIRE", "1") != "0"
+sortie = os.environ.get("PM_TELEMETRIE_SORTIE", "telemetrie")
+
+# Étapes cumulées par chemin ("Q3d/relaxation") : durée, temps CPU, nombre
+# d'entrées, pic de mémoire des tableaux (tracemalloc suit les allocations
+# numpy) et compteurs libres (iterations, pas_trajectoire, ...)
+etapes = {}
+_pile = []
+
+
+def activer(avec_profil=False, fichier=None, avec_memoire=True):
+    global actif, profil, sortie, memoire
+    actif = True
+    profil = profil or avec_profil
+    memoire = memoire and avec_memoire
+    sortie = fichier or sortie
+
+
+def _pic_memoire():
+    return tracemalloc.get_traced_memory()[1] if memoire else 0
+
+
+def _entree(chemin):
+    return etapes.setdefault(chemin, {'etape': chemin, 'appels': 0, 'duree_s': 0.0,
+                                      'cpu_s': 0.0, 'memoire_pic_octets': 0, 'compteurs': {}})
+
+
+# ===============================
+# Étapes et compteurs
+# ===============================
+class etape:
+    # with telemetrie.etape("relaxation"): ... ; les étapes s'emboîtent
+    def __init__(self, nom):
+        self.nom = nom
+
+    def __enter__(self):
+        if not actif:
+            return self
+        if memoire and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if _pile:
+            # Le pic courant revient à l'étape englobante avant remise à zéro
+            _pile[-1]['pic'] = max(_pile[-1]['pic'], _pic_memoire())
+        if memoire:
+            tracemalloc.reset_peak()
+        chemin = "/".join([n['chemin'] for n in _pile[-1:]] + [self.nom])
+        _entree(chemin)  # Ordre du rapport : ordre d'entrée dans les étapes
+        self.cadre = {'chemin': chemin, 'pic': 0, 'profil': None,
+                      't0': time.perf_counter(), 'cpu0': time.process_time()}
+        if profil and not _pile:
+            self.cadre['profil'] = cProfile.Profile()
+            self.cadre['profil'].enable()
+        _pile.append(self.cadre)
+        return self
+
+    def __exit__(self, *exc):
+        if not actif or not hasattr(self, 'cadre'):
+            return False
+        cadre = _pile.pop()
+        if cadre['profil'] is not None:
+            cadre['profil'].disable()
+            nom = re.sub(r"[^\w.-]+", "_", cadre['chemin'])
+            cadre['profil'].dump_stats(f"{sortie}_{nom}.prof")
+        pic = max(cadre['pic'], _pic_memoire())
+        entree = _entree(cadre['chemin'])
+        entree['appels'] += 1
+        entree['duree_s'] += time.perf_counter() - cadre['t0']
+        entree['cpu_s'] += time.process_time() - cadre['cpu0']
+        entree['memoire_pic_octets'] = max(entree['memoire_pic_octets'], pic) if memoire else None
+        if _pile:
+            _pile[-1]['pic'] = max(_pile[-1]['pic'], pic)
+        return False
+
+
+def compter(nom, valeur=1):
+    # Ajoute valeur au compteur `nom` de l'étape en cours
+    if not actif:
+        return
+    chemin = _pile[-1]['chemin'] if _pile else "hors_etape"
+    compteurs = _entree(chemin)['compteurs']
+    compteurs[nom] = compteurs.get(nom, 0) + valeur
+
+
+# ===============================
+# Rapport
+# ===============================
+def rapport():
+    lignes = []
+    for entree in etapes.values():
+        ligne = {k: v for k, v in entree.items() if k != 'compteurs'}
+        ligne.update(entree['compteurs'])
+        if 'iterations' in ligne and entree['duree_s'] > 0:
+            ligne['balayages_par_s'] = ligne['iterations'] / entree['duree_s']
+        if 'pas_trajectoire' in ligne and entree['duree_s'] > 0:
+            ligne['pas_par_s'] = ligne['pas_trajectoire'] / entree['duree_s']
+        lignes.append(ligne)
+    return lignes
+
+
+def ecrire(fichier=None):
+    # Écrit <fichier>.json et <fichier>.csv ; sans effet si désactivée
+    if not actif:
+        return None
+    fichier = fichier or sortie
+    lignes = rapport()
+    with open(fichier + ".json", "w") as f:
+        json.dump({'date': time.strftime("%Y-%m-%d %H:%M:%S"), 'etapes': lignes}, f, indent=2)
+    colonnes = list(dict.fromkeys(k for ligne in lignes for k in ligne))
+    with open(fichier + ".csv", "w", newline="") as f:
+        ecrivain = csv.DictWriter(f, fieldnames=colonnes)
+        ecrivain.writeheader()
+        ecrivain.writerows(lignes)
+    print(f"Télémétrie écrite dans {fichier}.json / {fichier}.csv")
+    return lignes
+
+
+def vider():
+    etapes.clear()
+    _pile.clear()
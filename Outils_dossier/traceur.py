@@ -0,0 +1,62 @@
+import numpy as np
+from Outils_dossier import telemetrie
+
+
+# ===============================
+# Traceur par lot
+# ===============================
+SORTI = -1  # Code de fin : électron sorti de la grille
+ACTIF = 0   # Code de fin : toujours en vol à la fin de la simulation
+
+
+def tracer_lot(etats, champ, dt, nb_steps, k_acc, etiquettes=None, enregistrer_tous=0):
+    # etats : (N, 4) = x, y, vx, vy en pixels et pixels/s, avancés ensemble par
+    # Euler (même schéma que les questions 3). champ : EchantillonneurChamp
+    # (ou tout objet ayant Nx, Ny et champ(x, y) -> (ex, ey)). Un électron est
+    # retiré dès qu'il quitte la grille Nx x Ny ou, si `etiquettes` (carte des
+    # dynodes, 0 = vide) est fournie, dès que sa case la plus proche appartient
+    # à une dynode.
+    # enregistrer_tous = k > 0 conserve les positions tous les k pas.
+    # Renvoie un dict : etats finaux, fin (SORTI, ACTIF ou numéro de dynode),
+    # pas de retrait, et éventuellement trajectoires (n_enregistrés, N, 2).
+    etats = np.array(etats, dtype=float)
+    N = etats.shape[0]
+    Ny, Nx = champ.Ny, champ.Nx
+    fin = np.full(N, ACTIF, dtype=np.int64)
+    pas_fin = np.full(N, nb_steps, dtype=np.int64)
+    actifs = np.arange(N)
+    trajectoires = []
+
+    for step in range(nb_steps):
+        if actifs.size == 0:
+            break
+        if enregistrer_tous and step % enregistrer_tous == 0:
+            trajectoires.append(etats[:, :2].copy())
+
+        x, y, vx, vy = etats[actifs].T
+        ex, ey = champ(x, y)
+        vx = vx + k_acc * ex * dt
+        vy = vy + k_acc * ey * dt
+        x = x + vx * dt
+        y = y + vy * dt
+        etats[actifs] = np.column_stack((x, y, vx, vy))
+
+        # Retrait des électrons sortis ou arrivés sur une dynode
+        sortis = ~((x >= 0) & (x < Nx) & (y >= 0) & (y < Ny))
+        retires = sortis.copy()
+        fin[actifs[sortis]] = SORTI
+        if etiquettes is not None:
+            ii = np.clip(np.rint(x).astype(np.intp), 0, Nx - 1)
+            jj = np.clip(np.rint(y).astype(np.intp), 0, Ny - 1)
+            touche = ~sortis & (etiquettes[jj, ii] > 0)
+            fin[actifs[touche]] = etiquettes[jj, ii][touche]
+            retires |= touche
+        pas_fin[actifs[retires]] = step + 1
+        actifs = actifs[~retires]
+
+    telemetrie.compter("pas_trajectoire", int(pas_fin.sum()))
+    resultat = {'etats': etats, 'fin': fin, 'pas': pas_fin, 'actif': fin == ACTIF}
+    if enregistrer_tous:
+        trajectoires.append(etats[:, :2].copy())
+        resultat['trajectoires'] = np.array(trajectoires)
+    return resultat
@@ -0,0 +1,128 @@
+import numpy as np
+import matplotlib.pyplot as plt
+from Outils_dossier.solveurs import resoudre
+from Outils_dossier.cache import champs_en_cache
+from Outils_dossier.geometrie import tube
+from Outils_dossier.jit import trajectoire_euler, trajectoire_euler_3d
+from Outils_dossier import rendu
+
+
+# ===============================
+# Tube fermé en 3D, dynodes en boîtes
+# ===============================
+# Grille (Nz, Ny, Nx) : le plan (y, x) est celui d'une Geometrie 2D, z est
+# la profondeur du tube. Les six faces du tube sont à 0 V ; chaque dynode
+# est une boîte de la géométrie 2D sur une largeur w centrée en z (au lieu
+# d'une plaque infiniment profonde). Stockage économe :
+#  - masque des cases fixées en booléens (1 octet par case) ;
+#  - valeurs imposées gardées seulement pour les cases fixées ;
+#  - potentiel et champ stockés en float32 (cache disque projeté en mémoire),
+#    la relaxation (multigrille + GC, la même qu'en 2D) travaillant en float64.
+class Geometrie3D:
+    def __init__(self, plan, profondeur_mm=6.0, largeur_mm=4.0):
+        self.plan = plan
+        self.scale = plan.scale
+        self.Nz = int(profondeur_mm * self.scale)
+        self.Ny, self.Nx = plan.shape
+        self.w = int(round(largeur_mm * self.scale))
+        self.z = (self.Nz - self.w) // 2
+
+        self.dynodes = [{**dyn, 'z': self.z, 'w': self.w} for dyn in plan.dynodes]
+
+        # Numéro de dynode par case (0 : vide ou paroi), sur un octet
+        self.etiquettes = np.zeros(self.shape, dtype=np.uint8)
+        for k, dyn in enumerate(self.dynodes):
+            self.etiquettes[dyn['z']:dyn['z'] + dyn['w'], dyn['y']:dyn['y'] + dyn['e'],
+                            dyn['x']:dyn['x'] + dyn['c']] = k + 1
+        self.fixe = self.etiquettes > 0
+        self.fixe[0] = self.fixe[-1] = True
+        self.fixe[:, 0] = self.fixe[:, -1] = True
+        self.fixe[:, :, 0] = self.fixe[:, :, -1] = True
+        self.indices_fixes = np.flatnonzero(self.fixe)
+        self.valeurs_fixes = plan.tension * np.take(self.etiquettes, self.indices_fixes)
+
+    @property
+    def shape(self):
+        return (self.Nz, self.Ny, self.Nx)
+
+    def init_conditions(self, V):
+        # np.put écrit dans V même s'il n'est pas contigu (reshape en ferait
+        # une copie, et l'écriture serait perdue)
+        np.put(V, self.indices_fixes, self.valeurs_fixes)
+        return V
+
+    def relaxation(self, V, tol=1e-3, max_iter=10000, methode="multigrille"):
+        # Les solveurs à balayage 2D (sor, jit, creux_*) ne s'appliquent pas ;
+        # le multigrille est écrit pour une dimension quelconque
+        V = resoudre(V, self.init_conditions, tol, max_iter, methode)
+        return V.astype(np.float32)
+
+    def calcul_champ_electrique(self, V):
+        # E = -grad V (V/mm), une composante à la fois pour limiter la mémoire
+        h = 1 / self.scale
+        Ez, Ey, Ex = (-np.gradient(V, h, axis=axe).astype(np.float32) for axe in range(3))
+        return Ex, Ey, Ez
+
+    def champs(self, tol=1e-3, methode="multigrille"):
+        # Renvoie (V, Ex, Ey, Ez)
+        return champs_en_cache(self.init_conditions, self.relaxation, self.shape, self.scale,
+                               self.calcul_champ_electrique, tol=tol, methode=methode,
+                               noms_champ=("Ex", "Ey", "Ez"))
+
+
+# ===============================
+# Comparaison 2D / 3D sur le tube des questions 3c/3d
+# ===============================
+def main(N=4, profondeur_mm=6.0, largeur_mm=4.0):
+    e_charge = -1.602e-19
+    m = 9.109e-31
+    dt = 3e-11
+    duree_totale = 3e-7
+    nb_steps = int(duree_totale / dt)
+    rebond_mm = 2.0
+
+    plan = tube(N)
+    g = Geometrie3D(plan, profondeur_mm, largeur_mm)
+    print(f"Grille 3D : {g.Nz} x {g.Ny} x {g.Nx} = {np.prod(g.shape):.2e} cases")
+    V, Ex, Ey, Ez = g.champs()
+    V2, Ex2, Ey2 = plan.champs(methode="multigrille")  # Même solveur qu'en 3D
+
+    scale = g.scale
+    k_acc = (e_charge / m) * scale * 1e3
+    x0, y0, z0 = 0.0, g.Ny / 2, (g.Nz - 1) / 2  # Plan de symétrie en z
+    pos3, touchees3, instants3 = trajectoire_euler_3d(
+        Ex, Ey, Ez, x0, y0, z0, 0.0, 0.0, 0.0, dt, nb_steps, k_acc,
+        dynodes=g.dynodes, rebond_pixels=rebond_mm * scale, details=True)
+    pos2, touchees2, instants2 = trajectoire_euler(
+        Ex2, Ey2, x0, y0, 0.0, 0.0, dt, nb_steps, k_acc,
+        dynodes=plan.dynodes, rebond_pixels=rebond_mm * scale, details=True)
+
+    print(f"2D : {touchees2}/{N} dynodes, transit {instants2[-1]:.3e} s")
+    print(f"3D : {touchees3}/{N} dynodes, transit {instants3[-1]:.3e} s, "
+          f"écart max en z {np.max(np.abs(pos3[:, 2] - z0)) / scale:.3f} mm")
+
+    # Seules les deux coupes affichées partent au rendu
+    rendu.figure("figures_dos/trajectoire_3d.png", dessiner_trajectoire_3d,
+                 V[g.Nz // 2], V[:, g.Ny // 2], pos2 / scale, pos3 / scale, scale=scale)
+
+
+def dessiner_trajectoire_3d(coupe_xy, coupe_xz, pos2, pos3, scale):
+    (Ny, Nx), Nz = coupe_xy.shape, coupe_xz.shape[0]
+    fig, (ax_xy, ax_xz) = plt.subplots(2, 1, figsize=(10, 7), sharex=True)
+    ax_xy.imshow(coupe_xy, cmap="inferno", origin="lower",
+                 extent=[0, Nx / scale, 0, Ny / scale])
+    ax_xy.plot(pos2[:, 0], pos2[:, 1], color="white", lw=1, ls="--", label="2D")
+    ax_xy.plot(pos3[:, 0], pos3[:, 1], color="cyan", lw=1.5, label="3D")
+    ax_xy.set_ylabel("y (mm)")
+    ax_xy.set_title("Trajectoire 3D (coupe z = milieu du tube)")
+    ax_xy.legend()
+    ax_xz.imshow(coupe_xz, cmap="inferno", origin="lower",
+                 extent=[0, Nx / scale, 0, Nz / scale])
+    ax_xz.plot(pos3[:, 0], pos3[:, 2], color="cyan", lw=1.5)
+    ax_xz.set_xlabel("x (mm)")
+    ax_xz.set_ylabel("z (mm)")
+    plt.tight_layout()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,81 +1,59 @@
 import numpy as np
 import matplotlib.pyplot as plt
+from Outils_dossier.geometrie import Geometrie
+from Outils_dossier.cache import champs_en_cache
+from Outils_dossier import rendu
 
 # ===============================
 # Paramètres géométriques (mm)
 # ===============================
 scale = 10  # 1 mm = 10 cases
-a = 3 * scale   # Espace dynode-extrémité
-b = 2 * scale   # Espace dynode-paroi
-c = 4 * scale   # Longueur dynode
-d = 2 * scale   # Distance entre dynodes du même côté
-e = int(0.2 * scale)  # Épaisseur dynode
-f = 6 * scale   # Hauteur du tube
-N = 4  # Nombre total de dynodes (2 en haut, 2 en bas)
+geometrie = Geometrie(
+    N=4,        # Nombre total de dynodes (2 en haut, 2 en bas)
+    a_mm=3,     # Espace dynode-extrémité
+    b_mm=2,     # Espace dynode-paroi
+    c_mm=4,     # Longueur dynode
+    d_mm=2,     # Distance entre dynodes du même côté
+    e_mm=0.2,   # Épaisseur dynode
+    f_mm=6,     # Hauteur du tube
+    scale=scale,
+)
+a, b, c, d, e, f, N = (geometrie.a, geometrie.b, geometrie.c, geometrie.d,
+                       geometrie.e, geometrie.f, geometrie.N)
 
 # ===============================
 # Grille : x = longueur, y = hauteur
 # ===============================
-Nx = int(a * 2 + 2 * c + d + 0.5 * (c + d))  # Largeur totale = 19 mm = 190 cases
-Ny = f  # Hauteur du tube
+Nx, Ny = geometrie.Nx, geometrie.Ny  # Largeur totale = 19 mm = 190 cases
 V = np.zeros((Ny, Nx))  # Grille du potentiel
 
 # ===============================
-# Conditions initiales (géométrie)
+# Conditions initiales et relaxation
 # ===============================
-def init_conditions(V):
-    # Bords du tube à 0 V
-    V[:, 0] = V[:, -1] = V[0, :] = V[-1, :] = 0
+# Masque des dynodes et des bords calculé une fois par Geometrie :
+# init_conditions est un seul np.copyto. relaxation(V, tol, max_iter,
+# methode) : methode = "jacobi" (historique) ou l'un des solveurs de
+# Outils_dossier.solveurs.SOLVEURS ("sor", "multigrille", "creux_lu", ...)
+init_conditions = geometrie.init_conditions
+relaxation = geometrie.relaxation
 
-    # Dynodes du bas (indices 0 et 1)
-    for i in range(N // 2):
-        x = int(a + i * (c + d))
-        V[b:b+e, x:x+c] = 100 * (2 * i + 1)
-
-    # Dynodes du haut (indices 2 et 3), décalées en x
-    for i in range(N // 2):
-        x = int(a + (i + 0.5) * (c + d))
-        V[-(b+e):-b, x:x+c] = 100 * (2 * i + 2)
-
-    return V
-
-# ===============================
-# Méthode de relaxation
-# ===============================
-def relaxation(V, tol=1e-3, max_iter=10000):
-    diff = tol + 1
-    iterations = 0
-
-    while diff > tol and iterations < max_iter:
-        V_old = V.copy()
-        V[1:-1, 1:-1] = 0.25 * (
-            V[2:, 1:-1] + V[:-2, 1:-1] +
-            V[1:-1, 2:] + V[1:-1, :-2]
-        )
-        V = init_conditions(V)
-        diff = np.max(np.abs(V - V_old))
-        iterations += 1
-
-    print(f"Convergence atteinte en {iterations} itérations (diff = {diff:.2e})")
-    return V
-
-# Affichage du potentiel
-def plot_potential(V):
+# Affichage du potentiel (sans affichage : rendu en arrière-plan, sauté si
+# V n'a pas changé depuis la dernière figure, voir Outils_dossier.rendu)
+def dessiner_potentiel(V):
     plt.figure(figsize=(10, 4))
     plt.imshow(V, cmap="inferno", origin="lower", extent=[0, Nx/scale, 0, Ny/scale])
     plt.colorbar(label="Potentiel (V)")
     plt.title("Potentiel dans le tube photomultiplicateur")
     plt.xlabel("x (mm)")
     plt.ylabel("y (mm)")
-    plt.savefig("figures_dos/potentiel_PM.png")
-    plt.show()
+
+def plot_potential(V):
+    return rendu.figure("figures_dos/potentiel_PM.png", dessiner_potentiel, V)
 
 # Exécution principale
 def main():
     print("Initialisation de la géométrie du tube PM...")
-    V = np.zeros((Ny, Nx))
-    V = init_conditions(V)
-    V = relaxation(V)
+    V = champs_en_cache(init_conditions, relaxation, (Ny, Nx), scale)
     plot_potential(V)
 
 if __name__ == "__main__":
@@ -5,7 +5,9 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
-from Q1_Calcul_Potentiel import relaxation, init_conditions, scale, Nx, Ny
+from Outils_dossier.fournisseurs import champs, Q1
+from Outils_dossier import rendu
+from Q1_Calcul_Potentiel import scale, Nx, Ny
 
 def calcul_champ_electrique(V):
     # Le pas spatial (chaque pixel vaut 1/scale mm)
@@ -15,7 +17,7 @@ def calcul_champ_electrique(V):
     Ey, Ex = np.gradient(-V, dy, dx)
     return Ex, Ey
 
-def plot_champ_electrique(V, Ex, Ey):
+def dessiner_champ_electrique(V, Ex, Ey):
     plt.style.use("default")
     fig, ax = plt.subplots(figsize=(10, 4))
 
@@ -52,8 +54,10 @@ def plot_champ_electrique(V, Ex, Ey):
     y = np.arange(0, Ny, step)
     X, Y = np.meshgrid(x, y)
 
-    Ex_sample = Ex[::step, ::step]
-    Ey_sample = Ey[::step, ::step]
+    # Copies : Ex/Ey peuvent venir du cache (lecture seule) et ne doivent pas
+    # être modifiés par le masquage ci-dessous
+    Ex_sample = np.array(Ex[::step, ::step])
+    Ey_sample = np.array(Ey[::step, ::step])
     magnitude = np.sqrt(Ex_sample**2 + Ey_sample**2)
 
     mask_sample = mask[::step, ::step]
@@ -99,17 +103,16 @@ def plot_champ_electrique(V, Ex, Ey):
     ax.set_xlabel("x (mm)")
     ax.set_ylabel("y (mm)")
     plt.tight_layout()
-    plt.savefig("figures_dos/champ_PM_dynodes_gris_sans_points.png", dpi=300)
-    plt.show()
 
-def main():
-    print("Calcul du potentiel pour la question 2...")
-    V = np.zeros((Ny, Nx))
-    V = init_conditions(V)
-    V = relaxation(V, tol=1e-3)
+def plot_champ_electrique(V, Ex, Ey):
+    # Rendu à 300 dpi en arrière-plan sans affichage, sauté si V, Ex et Ey
+    # sont ceux de la figure existante (voir Outils_dossier.rendu)
+    return rendu.figure("figures_dos/champ_PM_dynodes_gris_sans_points.png",
+                        dessiner_champ_electrique, V, Ex, Ey, dpi=300)
 
-    print("Calcul du champ électrique...")
-    Ex, Ey = calcul_champ_electrique(V)
+def main():
+    print("Calcul du potentiel et du champ électrique pour la question 2...")
+    V, Ex, Ey = champs(Q1)
 
     print("Affichage du champ électrique...")
     plot_champ_electrique(V, Ex, Ey)
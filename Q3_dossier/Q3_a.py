@@ -3,9 +3,10 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 import numpy as np
 import matplotlib.pyplot as plt
-from scipy.interpolate import RegularGridInterpolator
-from Q1_Calcul_Potentiel import relaxation, init_conditions, scale, Nx, Ny
-from Q2_Champ_Electrique import calcul_champ_electrique
+from Q1_Calcul_Potentiel import init_conditions, scale, Nx, Ny
+from Outils_dossier.fournisseurs import champs, Q1
+from Outils_dossier.interpolation import EchantillonneurChamp
+from Outils_dossier.electrodes import IndexElectrodes
 
 # Constantes physiques
 e = -1.602e-19  # charge de l'électron (C)
@@ -24,51 +25,59 @@ vx0, vy0 = 0.0, 0.0      # vitesse initiale (mm/s)
 x0 = x0_mm * scale
 y0 = y0_mm * scale
 
-# Préparer le potentiel et le champ
-V = np.zeros((Ny, Nx))
-V = init_conditions(V)
-V = relaxation(V, tol=1e-3)
-Ex, Ey = calcul_champ_electrique(V)
-
-# Création d'interpolateurs pour le champ
-x = np.arange(Nx)
-y = np.arange(Ny)
-interp_Ex = RegularGridInterpolator((y, x), Ex)
-interp_Ey = RegularGridInterpolator((y, x), Ey)
-
-# Initialisation des trajectoires
-positions = [(x0, y0)]
-vitesses = [(vx0, vy0)]
-
-# Potentiels des dynodes
-dynode_potentiels = [100, 200, 300, 400]
-rebound_margin = 1  # tolérance autour du potentiel (V)
-
-# Simulation avec rebond sur dynodes
-x, y = x0, y0
-vx, vy = vx0, vy0
-for step in range(nb_steps):
-    if not (0 <= x < Nx and 0 <= y < Ny):
-        break  # L'électron sort du domaine
-
-    # Champ local
-    E = np.array([interp_Ex((y, x)), interp_Ey((y, x))])
-    ax = (e / m) * E[0] * scale * 1e3  # en mm/s²
-    ay = (e / m) * E[1] * scale * 1e3
-
-    # Intégration d'Euler
-    vx += ax * dt
-    vy += ay * dt
-    x += vx * dt
-    y += vy * dt
-
-    # Vérification d'impact sur dynode (rebond)
-    local_V = V[int(round(y)), int(round(x))]
-    if any(abs(local_V - vp) <= rebound_margin for vp in dynode_potentiels):
-        vy = -vy  # rebond vertical
-
-    positions.append((x, y))
-    vitesses.append((vx, vy))
-
-# Conversion en mm pour affichage
-positions = np.array(positions) / scale
+# Aucun calcul à l'import : le potentiel, le champ et la trajectoire ne sont
+# calculés qu'à l'appel de main()
+# critere : "electrodes" (case dans une dynode, IndexElectrodes) ou
+# "potentiel" (ancien critère à 1 V près, voir IndexElectrodes.dynode_potentiel)
+def main(critere="electrodes"):
+    if critere not in ("electrodes", "potentiel"):
+        raise ValueError(f"Critère de rebond inconnu : {critere!r} (disponibles : electrodes, potentiel)")
+    # Préparer le potentiel et le champ
+    V, Ex, Ey = champs(Q1)
+
+    # Création d'interpolateurs pour le champ
+    champ = EchantillonneurChamp(Ex, Ey)
+
+    # Initialisation des trajectoires
+    positions = [(x0, y0)]
+    vitesses = [(vx0, vy0)]
+
+    # Index des dynodes (case -> numéro de dynode)
+    index = IndexElectrodes(init_conditions, (Ny, Nx))
+
+    # Simulation avec rebond sur dynodes
+    x, y = x0, y0
+    vx, vy = vx0, vy0
+    for step in range(nb_steps):
+        if not (0 <= x < Nx and 0 <= y < Ny):
+            break  # L'électron sort du domaine
+
+        # Champ local
+        E = champ(x, y)
+        ax = (e / m) * E[0] * scale * 1e3  # en mm/s²
+        ay = (e / m) * E[1] * scale * 1e3
+
+        # Intégration d'Euler
+        vx += ax * dt
+        vy += ay * dt
+        x += vx * dt
+        y += vy * dt
+
+        # Vérification d'impact sur dynode (rebond)
+        if critere == "potentiel":
+            sur_dynode = index.dynode_potentiel(V, x, y)
+        else:
+            sur_dynode = index.dynode(x, y)
+        if sur_dynode:
+            vy = -vy  # rebond vertical
+
+        positions.append((x, y))
+        vitesses.append((vx, vy))
+
+    # Conversion en mm pour affichage
+    positions = np.array(positions) / scale
+    return positions
+
+
+if __name__ == "__main__":
+    main()
@@ -3,11 +3,29 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 import numpy as np
 import matplotlib.pyplot as plt
-from scipy.interpolate import RegularGridInterpolator
-from Q1_Calcul_Potentiel import relaxation, init_conditions, scale, Nx, Ny
-from Q2_Champ_Electrique import calcul_champ_electrique
+from Q1_Calcul_Potentiel import init_conditions, scale, Nx, Ny
+from Outils_dossier.fournisseurs import champs, Q1
+from Outils_dossier.interpolation import EchantillonneurChamp
+from Outils_dossier.electrodes import IndexElectrodes
+from Outils_dossier import rendu, telemetrie
 
-def main():
+def dessiner_trajectoire(V, positions, x0_mm, y0_mm):
+    plt.figure(figsize=(10, 5))
+    plt.imshow(V, cmap="inferno", origin="lower", extent=[0, Nx / scale, 0, Ny / scale])
+    plt.colorbar(label="Potentiel (V)")
+    plt.plot(positions[:, 0], positions[:, 1], color="cyan", lw=1.5, label="Trajectoire de l'électron")
+    plt.scatter([x0_mm], [y0_mm], color="cyan", label="Départ", zorder=5)
+    plt.title("Trajectoire de l'électron dans le tube photomultiplicateur avec  rebond (inversion de vitesse)")
+    plt.xlabel("x (mm)")
+    plt.ylabel("y (mm)")
+    plt.legend(loc = 'upper left')
+    plt.tight_layout()
+
+# critere : "electrodes" (case dans une dynode, IndexElectrodes) ou
+# "potentiel" (ancien critère à 1 V près, voir IndexElectrodes.dynode_potentiel)
+def main(critere="electrodes"):
+    if critere not in ("electrodes", "potentiel"):
+        raise ValueError(f"Critère de rebond inconnu : {critere!r} (disponibles : electrodes, potentiel)")
     # Constantes physiques
     e = -1.602e-19  # charge de l'électron (C)
     m = 9.109e-31   # masse de l'électron (kg)
@@ -25,56 +43,44 @@ def main():
     y0 = y0_mm * scale
 
     # Potentiel + champ
-    V = np.zeros((Ny, Nx))
-    V = init_conditions(V)
-    V = relaxation(V, tol=1e-3)
-    Ex, Ey = calcul_champ_electrique(V)
+    V, Ex, Ey = champs(Q1)
 
     # Interpolation du champ
-    x = np.arange(Nx)
-    y = np.arange(Ny)
-    interp_Ex = RegularGridInterpolator((y, x), Ex)
-    interp_Ey = RegularGridInterpolator((y, x), Ey)
+    champ = EchantillonneurChamp(Ex, Ey)
 
     # Initialisation
     positions = [(x0, y0)]
     vitesses = [(vx0, vy0)]
-    dynode_potentiels = [100, 200, 300, 400]
-    rebound_margin = 1
+    index = IndexElectrodes(init_conditions, (Ny, Nx))
 
     # Simulation avec rebond
     x, y = x0, y0
     vx, vy = vx0, vy0
-    for step in range(nb_steps):
-        if not (0 <= x < Nx and 0 <= y < Ny):
-            break
-        E = np.array([interp_Ex((y, x)), interp_Ey((y, x))])
-        ax = (e / m) * E[0] * scale * 1e3
-        ay = (e / m) * E[1] * scale * 1e3
-        vx += ax * dt
-        vy += ay * dt
-        x += vx * dt
-        y += vy * dt
-        local_V = V[int(round(y)), int(round(x))]
-        if any(abs(local_V - vp) <= rebound_margin for vp in dynode_potentiels):
-            vy = -vy
-        positions.append((x, y))
-        vitesses.append((vx, vy))
+    with telemetrie.etape("integration"):
+        for step in range(nb_steps):
+            if not (0 <= x < Nx and 0 <= y < Ny):
+                break
+            E = champ(x, y)
+            ax = (e / m) * E[0] * scale * 1e3
+            ay = (e / m) * E[1] * scale * 1e3
+            vx += ax * dt
+            vy += ay * dt
+            x += vx * dt
+            y += vy * dt
+            if critere == "potentiel":
+                sur_dynode = index.dynode_potentiel(V, x, y)
+            else:
+                sur_dynode = index.dynode(x, y)
+            if sur_dynode:
+                vy = -vy
+            positions.append((x, y))
+            vitesses.append((vx, vy))
+        telemetrie.compter("pas_trajectoire", len(positions) - 1)
 
     positions = np.array(positions) / scale
 
     # Affichage
-    plt.figure(figsize=(10, 5))
-    plt.imshow(V, cmap="inferno", origin="lower", extent=[0, Nx / scale, 0, Ny / scale])
-    plt.colorbar(label="Potentiel (V)")
-    plt.plot(positions[:, 0], positions[:, 1], color="cyan", lw=1.5, label="Trajectoire de l'électron")
-    plt.scatter([x0_mm], [y0_mm], color="cyan", label="Départ", zorder=5)
-    plt.title("Trajectoire de l'électron dans le tube photomultiplicateur avec  rebond (inversion de vitesse)")
-    plt.xlabel("x (mm)")
-    plt.ylabel("y (mm)")
-    plt.legend(loc = 'upper left')
-    plt.tight_layout()
-    plt.savefig("figures_dos/trajectoire_electron_b_rebond.png")
-    plt.show()
+    rendu.figure("figures_dos/trajectoire_electron_b_rebond.png", dessiner_trajectoire,
+                 V, positions, x0_mm=x0_mm, y0_mm=y0_mm)
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -4,12 +4,30 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 import numpy as np
 import matplotlib.pyplot as plt
-from scipy.interpolate import RegularGridInterpolator
-from Q3_dossier.Q1_pour3d import relaxation, init_conditions, scale, Nx, Ny, a, b, c, d, e, f
-from Q2_Champ_Electrique import calcul_champ_electrique
+from Q3_dossier.Q1_pour3d import scale, Nx, Ny, a, b, c, d, e, f
+from Outils_dossier.fournisseurs import champs, Q1_POUR3D
+from Outils_dossier.interpolation import EchantillonneurChamp
+from Outils_dossier.integrateurs import integrer
+from Outils_dossier import rendu
 
-def main():
+def dessiner_trajectoire(V, positions, x0_mm, y0_mm):
+    plt.figure(figsize=(23, 6))
+    plt.imshow(V, cmap="inferno", origin="lower", extent=[0, Nx/scale, 0, Ny/scale])
+    plt.colorbar(label="Potentiel (V)")
+    plt.plot(positions[:, 0], positions[:, 1], color="cyan", lw=1.5, label="Trajectoire")
+    plt.scatter([x0_mm], [y0_mm], color="cyan", label="Départ", zorder=5)
+    plt.title("Trajectoire de l’électron dans un photomultiplicateur de 12 dynodes")
+    plt.xlabel("x (mm)")
+    plt.ylabel("y (mm)")
+    plt.legend(loc='upper left', fontsize=7)
+    plt.tight_layout()
+
+# methode : "euler" (pas fixe dt, boucle compilée) ou "rk45" / "verlet"
+# (Outils_dossier.integrateurs : pas adaptatif, impacts localisés sur le bord
+# des dynodes, même rebond)
+def main(methode="euler"):
     global a,b,c,d,e,f,scale
+    from Outils_dossier.jit import trajectoire_euler  # Numba chargé au premier lancement
     # === Affichage des paramètres géométriques ===
     print("\n=== Paramètres géométriques utilisés pour la question 3d ===")
     print(f"a (espace dynode-extrémité) : {a/scale:.2f} mm")
@@ -37,16 +55,7 @@ def main():
     y0 = y0_mm * scale
 
     # Potentiel et champ
-    V = np.zeros((Ny, Nx))
-    V = init_conditions(V)
-    V = relaxation(V)
-    Ex, Ey = calcul_champ_electrique(V)
-
-    # Interpolateurs
-    x_vals = np.arange(Nx)
-    y_vals = np.arange(Ny)
-    interp_Ex = RegularGridInterpolator((y_vals, x_vals), Ex, bounds_error=False, fill_value=0)
-    interp_Ey = RegularGridInterpolator((y_vals, x_vals), Ey, bounds_error=False, fill_value=0)
+    V, Ex, Ey = champs(Q1_POUR3D)
 
     # Fonction pour construire les dynodes
     def get_dynodes_ordonnes(scale, a, b, c, d, e, f):
@@ -66,67 +75,26 @@ def main():
         return dynodes_ordonnees
 
     dynodes_sequence = get_dynodes_ordonnes(scale, a, b, c, d, e, f)
-    dynode_idx = 0  # dynode à viser
 
     rebond_pixels = 2 * scale  # Rebond de 2 mm
 
-    def electron_touche_dynode(x, y, dynode):
-        return (
-            dynode['x'] <= x <= dynode['x'] + dynode['c'] and
-            dynode['y'] <= y <= dynode['y'] + dynode['e']
-        )
-
-    # Initialisation de la simulation
-    positions = [(x0, y0)]
-    x, y = x0, y0
-    vx, vy = vx0, vy0
-
-    for step in range(nb_steps):
-        if not (0 <= x < Nx and 0 <= y < Ny):
-            break
-
-        # Champ local
-        E = np.array([interp_Ex((y, x)), interp_Ey((y, x))])
-        ax = (e_charge / m) * E[0] * scale * 1e3
-        ay = (e_charge / m) * E[1] * scale * 1e3
-
-        # Intégration Euler
-        vx += ax * dt
-        vy += ay * dt
-        x += vx * dt
-        y += vy * dt
-
-        # Empêcher de sortir de la grille
-        x = min(max(x, 0), Nx - 1)
-        y = min(max(y, 0), Ny - 1)
-
-        # Vérification impact dynode
-        if dynode_idx < len(dynodes_sequence):
-            d = dynodes_sequence[dynode_idx]
-            if electron_touche_dynode(x, y, d):
-                direction = -1 if vy > 0 else 1
-                y += direction * rebond_pixels
-                vy = 0
-                dynode_idx += 1
-
-        positions.append((x, y))
+    # Simulation (boucle compilée par Numba si disponible)
+    k_acc = (e_charge / m) * scale * 1e3
+    if methode == "euler":
+        positions = trajectoire_euler(Ex, Ey, x0, y0, vx0, vy0, dt, nb_steps, k_acc,
+                                      dynodes=dynodes_sequence, rebond_pixels=rebond_pixels)
+    else:
+        resultat = integrer(EchantillonneurChamp(Ex, Ey), (x0, y0, vx0, vy0), k_acc, methode,
+                            dynodes=dynodes_sequence, rebond_pixels=rebond_pixels, dt0=dt,
+                            t_max=duree_totale)
+        positions = resultat['etats'][:, :2]
 
     # Conversion pour affichage
     positions = np.array(positions) / scale
 
     # Affichage
-    plt.figure(figsize=(23, 6))
-    plt.imshow(V, cmap="inferno", origin="lower", extent=[0, Nx/scale, 0, Ny/scale])
-    plt.colorbar(label="Potentiel (V)")
-    plt.plot(positions[:, 0], positions[:, 1], color="cyan", lw=1.5, label="Trajectoire")
-    plt.scatter([x0_mm], [y0_mm], color="cyan", label="Départ", zorder=5)
-    plt.title("Trajectoire de l’électron dans un photomultiplicateur de 12 dynodes")
-    plt.xlabel("x (mm)")
-    plt.ylabel("y (mm)")
-    plt.legend(loc='upper left', fontsize=7)
-    plt.tight_layout()
-    plt.savefig("figures_dos/trajectoire_ordonnée_3d.png")
-    plt.show()
+    rendu.figure("figures_dos/trajectoire_ordonnée_3d.png", dessiner_trajectoire,
+                 V, positions, x0_mm=x0_mm, y0_mm=y0_mm)
 
 # =============== Exécution du main ===============
 if __name__ == "__main__":
@@ -4,33 +4,45 @@
 
 import Q1_Calcul_Potentiel as q1
 import Q2_Champ_Electrique as q2
-import Q3_dossier.Q3_a as q3a
 import Q3_dossier.Q3_b as q3b
 import Q3_dossier.Q3_b_rebond as q3br
 import Q3_dossier.Q3_c as q3c
 import Q3_dossier.Q3_d as q3d
-import Q3_dossier.Q1_pour3c as q3pc
-import Q3_dossier.Q1_pour3d as q3pd
+from Outils_dossier import rendu, telemetrie
 
 
 def main():
+    # PM_TELEMETRIE=1 : temps, compteurs et pic mémoire par étape, écrits dans
+    # telemetrie.json / telemetrie.csv (voir Outils_dossier.telemetrie)
     print("\n=== EXÉCUTION DU TP D'ÉLECTROMAGNÉTISME ===\n")
 
     print(" Question 1: Calcul du potentiel")
-    q1.main()  # Exécute la fonction main() de Q1_Calcul_Potentiel.py
+    with telemetrie.etape("Q1"):
+        q1.main()  # Exécute la fonction main() de Q1_Calcul_Potentiel.py
 
     print("\n Question 2: Calcul du champ électrique")
-    q2.main()  # Exécute la fonction main() de Q2_Champ_Electrique.py
+    with telemetrie.etape("Q2"):
+        q2.main()  # Exécute la fonction main() de Q2_Champ_Electrique.py
 
     print("\n Question 3b: Résulatas graphiques")
-    q3br.main()
-    q3b.main()
+    with telemetrie.etape("Q3b_rebond"):
+        q3br.main()
+    with telemetrie.etape("Q3b"):
+        q3b.main()
 
     print("\n Question 3c: Optimisation de la géométrie")
-    q3c.main()
+    with telemetrie.etape("Q3c"):
+        q3c.main()
 
     print("\n Question 3d: PM à 12 dynodes")
-    q3d.main()
+    with telemetrie.etape("Q3d"):
+        q3d.main()
+
+    # Sans affichage, les figures sont rendues en arrière-plan pendant les
+    # calculs des questions suivantes : on attend ici les dernières
+    with telemetrie.etape("attente_figures"):
+        rendu.attendre()
+    telemetrie.ecrire()
 
 if __name__ == "__main__":
     main()
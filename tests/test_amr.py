@@ -0,0 +1,57 @@
+import numpy as np
+from Outils_dossier.amr import EchantillonneurAMR, blocs, taille_bloc
+
+
+# ===============================
+# Champ linéaire : grilles grossière et fine donnent la même valeur partout
+# ===============================
+def champ_lineaire(x, y):
+    return 1.0 + 0.5 * x - 0.25 * y, -2.0 + 0.125 * x + 0.75 * y
+
+
+def amr_lineaire(boite=(4, 10, 3, 12), r=4, shape=(16, 20)):
+    Ny, Nx = shape
+    yy, xx = np.mgrid[0:Ny, 0:Nx].astype(float)
+    Ex, Ey = champ_lineaire(xx, yy)
+    j0, j1, i0, i1 = boite
+    yf, xf = np.mgrid[0:r * (j1 - j0) + 1, 0:r * (i1 - i0) + 1].astype(float)
+    Exf, Eyf = champ_lineaire(i0 + xf / r, j0 + yf / r)
+    # Champ fin décalé : on sait ainsi quelle grille a répondu
+    patch = {'boite': boite, 'Ex': Exf + 100.0, 'Ey': Eyf + 100.0}
+    return {'facteur': r, 'Ex': Ex, 'Ey': Ey, 'patches': [patch]}
+
+
+def test_bords_haut_et_droit_du_rectangle():
+    amr = amr_lineaire()
+    j0, j1, i0, i1 = amr['patches'][0]['boite']
+    echantillonneur = EchantillonneurAMR(amr)
+    eps = 1e-3
+
+    # Juste à l'intérieur des bords haut et droit : grille fine
+    for x, y in [(0.5 * (i0 + i1), j1 - eps), (i1 - eps, 0.5 * (j0 + j1)), (i1 - eps, j1 - eps)]:
+        ex, ey = echantillonneur(x, y)
+        attendu = champ_lineaire(x, y)
+        assert np.allclose((ex - 100.0, ey - 100.0), attendu)
+
+    # Juste au-delà (cases j1 et i1) : grille grossière, jamais un champ nul
+    for x, y in [(0.5 * (i0 + i1), j1 + 0.5), (i1 + 0.5, 0.5 * (j0 + j1)),
+                 (0.5 * (i0 + i1), j1 + eps), (i1 + eps, 0.5 * (j0 + j1))]:
+        assert np.allclose(echantillonneur(x, y), champ_lineaire(x, y))
+
+
+def test_lot_identique_au_scalaire():
+    amr = amr_lineaire()
+    echantillonneur = EchantillonneurAMR(amr)
+    rng = np.random.default_rng(0)
+    x = rng.uniform(0, 19, 200)
+    y = rng.uniform(0, 15, 200)
+    ex, ey = echantillonneur(x, y)
+    attendu = np.array([echantillonneur(a, b) for a, b in zip(x, y)])
+    assert np.allclose(ex, attendu[:, 0]) and np.allclose(ey, attendu[:, 1])
+
+
+def test_blocs_grille_multiple_de_la_taille_des_blocs():
+    # Ny - 1 multiple de taille_bloc (tube à 12 dynodes, scale = 20)
+    drapeaux = np.zeros((2 * taille_bloc + 1, 3 * taille_bloc + 1), dtype=bool)
+    drapeaux[-2, -2] = True
+    assert blocs(drapeaux) == [(taille_bloc, 2 * taille_bloc, 2 * taille_bloc, 3 * taille_bloc)]
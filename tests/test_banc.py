@@ -0,0 +1,25 @@
+from Outils_dossier import banc
+
+
+def test_banc_geometrie_chronometre_toutes_les_relaxations():
+    mesures = banc.banc_geometrie("N4", 5, repetitions=2)
+    relaxations = {m['methode']: m for m in mesures if m['etape'] == "relaxation"}
+    # La relaxation de production (Jacobi) est mesurée par défaut
+    assert set(relaxations) == {"jacobi", "sor", "multigrille"}
+    for m in relaxations.values():
+        assert m['iterations'] > 0 and m['temps'] <= m['temps_median']
+        assert m['memes_dynodes']
+    assert {m['etape'] for m in mesures} >= {"calcul_champ_electrique", "trajectoire",
+                                             "trajectoires_lot"}
+
+
+def test_regressions_temps_et_precision():
+    ancien = {'mesures': [banc.mesure("relaxation", "N4", 10, "sor", (1.0, 1.0),
+                                      erreur_V=1e-3, memes_dynodes=True)]}
+    identique = {'mesures': [dict(ancien['mesures'][0])]}
+    assert banc.regressions(ancien, identique) == []
+
+    lent = {'mesures': [banc.mesure("relaxation", "N4", 10, "sor", (2.0, 2.0),
+                                    erreur_V=1e-2, memes_dynodes=False)]}
+    signalees = banc.regressions(ancien, lent)
+    assert len(signalees) == 1 and len(signalees[0]['motifs']) == 3
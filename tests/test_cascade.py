@@ -0,0 +1,59 @@
+import numpy as np
+from types import SimpleNamespace
+from Outils_dossier import cache, cascade
+
+nb_dynodes = 5
+largeur = 10.0  # La dynode k occupe x dans [largeur (k - 1), largeur k)
+
+
+# ===============================
+# Chaîne jouet : un secondaire émis vers le haut atteint la dynode suivante,
+# les autres retombent sur leur dynode émettrice
+# ===============================
+class IndexJouet:
+    tensions = 100.0 * np.arange(1, nb_dynodes + 1)
+    etiquettes = None
+
+    def requete(self, x, y):
+        x = np.asarray(x)
+        return None, np.zeros_like(x), (np.ones_like(x), np.zeros_like(x))
+
+
+def tracer_jouet(etats, champ, dt, nb_steps, k_acc, etiquettes):
+    x, vy = etats[:, 0], etats[:, 3]
+    dynode = np.minimum(np.floor(x / largeur).astype(np.intp) + 1, nb_dynodes)
+    fin = np.where(vy > 0, np.minimum(dynode + 1, nb_dynodes), dynode)
+    sortie = etats.copy()
+    sortie[:, 0] = np.where(fin > dynode, largeur * (fin - 1), x)
+    return {'fin': fin, 'etats': sortie}
+
+
+def test_arrivees_croissantes_le_long_de_la_chaine(monkeypatch):
+    ctx = {'g': SimpleNamespace(scale=1.0, f=0.0), 'champ': None, 'index': IndexJouet()}
+    monkeypatch.setattr(cascade, "contexte", lambda nom: ctx)
+    monkeypatch.setattr(cascade, "tracer_lot", tracer_jouet)
+    res = cascade.gain(nb_primaires=20, nom="jouet")
+
+    arrivees, retours = res['impacts_par_dynode'], res['retours_par_dynode']
+    # Un photoélectron par cascade sur la première dynode ; les secondaires qui
+    # y retombent sont comptés à part
+    assert arrivees[0] == 1.0
+    assert retours[:-1].sum() > 0
+    assert np.all(np.diff(arrivees) > 0)
+    assert res['gain'] == arrivees[-1]
+
+
+# ===============================
+# Tube réel des questions 3d (12 dynodes)
+# ===============================
+def test_gain_sur_le_tube_de_la_question_3d(monkeypatch, tmp_path):
+    monkeypatch.setattr(cache, "dossier", str(tmp_path))
+    monkeypatch.setattr(cascade, "_contexte", {})
+    monkeypatch.setattr(cascade, "max_particules", 300)  # Rééchantillonnage : gain moyen conservé
+    res = cascade.gain(nb_primaires=2)
+
+    arrivees = res['impacts_par_dynode']
+    assert res['gain'] > 1
+    assert np.all(arrivees > 0)
+    # Multiplication à chaque étage
+    assert np.all(np.diff(arrivees) > 0)
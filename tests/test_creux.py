@@ -0,0 +1,22 @@
+import numpy as np
+from Outils_dossier import creux
+
+
+def masque(k, shape=(12, 12)):
+    fixe = np.zeros(shape, dtype=bool)
+    fixe[0, :] = fixe[-1, :] = fixe[:, 0] = fixe[:, -1] = True
+    fixe[1 + k // 8, 1 + k % 8] = True  # Une géométrie différente par k
+    return fixe
+
+
+def test_cache_des_factorisations_borne(monkeypatch):
+    monkeypatch.setattr(creux, "taille_cache", 3)
+    creux.vider_cache()
+    premier = creux.systeme(masque(0))
+    for k in range(1, 10):
+        creux.systeme(masque(k))
+        creux.systeme(masque(0))  # Souvent relu : jamais évincé
+        assert len(creux._systemes) <= 3
+    assert creux.systeme(masque(0)) is premier
+    assert creux.systeme(masque(1)) is not None and len(creux._systemes) == 3
+    creux.vider_cache()
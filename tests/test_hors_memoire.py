@@ -0,0 +1,17 @@
+import os
+import numpy as np
+from Outils_dossier import cache
+from Outils_dossier.geometrie import tube
+from Outils_dossier.hors_memoire import champs_hors_memoire
+
+
+# ===============================
+# Fichiers dans le dossier de cache courant, même modifié après l'import
+# ===============================
+def test_dossier_lu_a_l_appel(monkeypatch, tmp_path):
+    monkeypatch.setattr(cache, "dossier", str(tmp_path))
+    g = tube(4, scale=3)
+    V, Ex, Ey = champs_hors_memoire(g, hauteur=8)
+    assert os.path.dirname(os.path.dirname(V.filename)) == str(tmp_path / "hors_memoire")
+    assert V.shape == Ex.shape == Ey.shape == g.shape
+    assert np.isfinite(np.asarray(V)).all()
@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+from Outils_dossier.integrateurs import STEPPERS, derivee, integrer
+
+
+class ChampCompte:
+    # Champ uniforme qui compte ses évaluations, sur une grille 100 x 100
+    Nx = Ny = 100
+
+    def __init__(self, ex=1.0, ey=-0.5):
+        self.ex, self.ey = ex, ey
+        self.appels = 0
+
+    def __call__(self, x, y):
+        self.appels += 1
+        return self.ex, self.ey
+
+
+@pytest.mark.parametrize("methode", sorted(STEPPERS))
+@pytest.mark.parametrize("reprise", [False, True])
+def test_nombre_d_evaluations_annonce(methode, reprise):
+    pas, _ = STEPPERS[methode]
+    champ = ChampCompte()
+    s = np.array([1.0, 2.0, 0.3, -0.1])
+    d0 = derivee(champ, 2.0, s) if reprise else None
+    champ.appels = 0
+    s_new, _, n_eval, d_new = pas(champ, 2.0, s, 0.1, d0)
+    assert n_eval == champ.appels
+    # Dérivée au nouvel état, reprise par le pas suivant
+    assert np.allclose(d_new, derivee(champ, 2.0, s_new))
+
+
+def test_verlet_exact_en_champ_uniforme():
+    pas, _ = STEPPERS["verlet"]
+    s = np.array([1.0, 2.0, 0.3, -0.1])
+    fin, erreur, _, _ = pas(ChampCompte(), 2.0, s, 0.1)
+    a = np.array([2.0, -1.0])
+    assert np.allclose(fin[:2], s[:2] + 0.1 * s[2:] + 0.5 * 0.01 * a)
+    assert np.allclose(erreur, 0.0)
+
+
+@pytest.mark.parametrize("methode", sorted(STEPPERS))
+def test_evaluations_comptees_sur_une_trajectoire(methode):
+    champ = ChampCompte()
+    r = integrer(champ, (50.0, 50.0, 0.0, 0.0), 1.0, methode, dt0=0.1, t_max=5.0)
+    assert r['evenement'] == "t_max"
+    assert r['nb_evaluations'] == champ.appels
+
+
+def test_depart_sur_le_bord_vers_l_exterieur():
+    champ = ChampCompte(0.0, 0.0)
+    r = integrer(champ, (0.0, 50.0, -1e9, 0.0), 1.0, dt0=3e-11)
+    assert r['evenement'] == "sortie"
+    assert r['temps'][-1] == 0.0
+    assert champ.appels < 20
+
+
+@pytest.mark.parametrize("methode", sorted(STEPPERS))
+def test_rebond_sur_les_dynodes_dans_l_ordre(methode):
+    # Chute uniforme (accélération -1 en y) : contact avec le dessus de la
+    # première dynode (y = 2) à t = 4, remontée de 5 pixels avec vy = 0, puis
+    # contact avec la seconde après sqrt(10) ; la dernière chute traverse la
+    # seconde dynode (plus visée) et sort par le bas
+    dynodes = [{'x': 5, 'y': 0, 'c': 7, 'e': 2}, {'x': 14, 'y': 0, 'c': 26, 'e': 2}]
+    r = integrer(ChampCompte(0.0, -1.0), (1.0, 10.0, 2.0, 0.0), 1.0, methode,
+                 dynodes=dynodes, rebond_pixels=5.0, dt0=0.1, t_max=100.0)
+    assert r['evenement'] == "sortie" and r['dynode'] is None
+    assert r['touchees'] == 2
+    assert np.allclose(r['instants'], [4.0, 4.0 + np.sqrt(10)])
+    assert np.isclose(r['temps'][-1], 4.0 + np.sqrt(10) + np.sqrt(14))
+
+    # Sans rebond : arrêt au premier contact
+    r = integrer(ChampCompte(0.0, -1.0), (1.0, 10.0, 2.0, 0.0), 1.0, methode,
+                 dynodes=dynodes, dt0=0.1, t_max=100.0)
+    assert (r['evenement'], r['dynode'], r['touchees']) == ("dynode", 0, 1)
+    assert np.isclose(r['temps'][-1], 4.0)
@@ -0,0 +1,46 @@
+import os
+import subprocess
+import sys
+import numpy as np
+import Q1_Calcul_Potentiel as q1
+from Outils_dossier import jit
+from Outils_dossier.solveurs import resoudre
+
+racine = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_balayage_compile_identique_a_la_sor():
+    shape = (q1.Ny, q1.Nx)
+    V_sor = resoudre(q1.init_conditions(np.zeros(shape)), q1.init_conditions, methode="sor")
+    V_jit = resoudre(q1.init_conditions(np.zeros(shape)), q1.init_conditions, methode="jit")
+    assert np.allclose(V_jit, V_sor, atol=1e-9)
+
+
+def test_pousseur_compile_identique_a_euler_python():
+    yy, xx = np.mgrid[0:40, 0:60].astype(float)
+    Ex, Ey = -0.5 - 0.01 * xx, 0.01 * (yy - 20.0) + 0.05
+    dt, k_acc = 2e-4, -2e4
+    positions = jit.trajectoire_euler(Ex, Ey, 0.0, 20.0, 0.0, 0.0, dt, 500, k_acc)
+
+    # Même schéma pas à pas en Python
+    x, y, vx, vy = 0.0, 20.0, 0.0, 0.0
+    attendues = [(x, y)]
+    for _ in range(500):
+        if not (0 <= x < 60 and 0 <= y < 40):
+            break
+        ex, ey = jit._champ_bilineaire(Ex, Ey, x, y)
+        vx += k_acc * ex * dt
+        vy += k_acc * ey * dt
+        x = min(max(x + vx * dt, 0.0), 59.0)
+        y = min(max(y + vy * dt, 0.0), 39.0)
+        attendues.append((x, y))
+    assert np.allclose(positions, attendues, rtol=1e-12, atol=1e-12)
+
+
+def test_import_du_programme_principal_sans_numba():
+    # Importer equipe-21-main ne doit ni calculer ni charger Numba
+    code = ("import importlib, sys; importlib.import_module('equipe-21-main'); "
+            "assert 'numba' not in sys.modules, 'numba importé'")
+    env = {**os.environ, 'MPLBACKEND': "Agg",
+           'PYTHONPATH': os.pathsep.join(filter(None, [racine, os.environ.get("PYTHONPATH")]))}
+    subprocess.run([sys.executable, "-c", code], cwd=racine, env=env, check=True)
@@ -0,0 +1,17 @@
+from Outils_dossier import cache, optimisation
+
+
+def test_transit_depend_de_la_geometrie(monkeypatch, tmp_path):
+    monkeypatch.setattr(cache, "dossier", str(tmp_path))
+    a, b, c, d, f = optimisation.reference
+    proche = optimisation.evaluer((a, b, c, 5.0, f), "transit", "creux_lu")
+    loin = optimisation.evaluer((a, b, c, 8.0, f), "transit", "creux_lu")
+
+    # Les 4 dynodes sont touchées dans les deux cas : le score est le temps
+    # d'impact sur la dernière, plus long quand les dynodes sont espacées
+    assert proche < optimisation.duree_totale and loin < optimisation.duree_totale
+    assert proche < loin
+
+    # Le départage de l'objectif "ordre" suit le même temps
+    assert (optimisation.evaluer((a, b, c, 5.0, f), "ordre", "creux_lu")
+            < optimisation.evaluer((a, b, c, 8.0, f), "ordre", "creux_lu"))
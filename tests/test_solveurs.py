@@ -0,0 +1,30 @@
+import numpy as np
+import Q1_Calcul_Potentiel as q1
+from Outils_dossier.parallele import relaxation_parallele
+from Outils_dossier.solveurs import comparer_methodes, relaxation_sor
+
+
+def test_sor_converge_vers_le_potentiel_de_jacobi():
+    shape = (q1.Ny, q1.Nx)
+    V_jacobi = q1.relaxation(q1.init_conditions(np.zeros(shape)), 1e-5, 100000)
+    V_sor = q1.relaxation(q1.init_conditions(np.zeros(shape)), 1e-5, 100000, methode="sor")
+    assert np.max(np.abs(V_sor - V_jacobi)) < 0.1
+
+
+def test_comparer_methodes_note_les_iterations():
+    resultats = comparer_methodes(q1.relaxation, q1.init_conditions, (q1.Ny, q1.Nx))
+    assert set(resultats) == {"jacobi", "sor"}
+    assert 0 < resultats["sor"]['iterations'] < resultats["jacobi"]['iterations']
+    assert all(r['temps'] > 0 for r in resultats.values())
+
+
+def test_sor_parallele_et_float32_suivent_la_sor():
+    shape = (q1.Ny, q1.Nx)
+    V_sor = relaxation_sor(q1.init_conditions(np.zeros(shape)), q1.init_conditions, 1e-4)
+    # Bandes : mêmes demi-pas que la SOR séquentielle, au bit près
+    V_par = relaxation_parallele(q1.init_conditions(np.zeros(shape)), q1.init_conditions,
+                                 1e-4, nb_processus=2)
+    assert np.array_equal(V_par, V_sor)
+    V_32 = relaxation_sor(q1.init_conditions(np.zeros(shape, np.float32)), q1.init_conditions, 1e-4)
+    assert V_32.dtype == np.float32
+    assert np.max(np.abs(V_32 - V_sor)) < 1e-2
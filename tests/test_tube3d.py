@@ -0,0 +1,18 @@
+import numpy as np
+from Outils_dossier.geometrie import tube
+from Outils_dossier.tube3d import Geometrie3D
+
+
+# ===============================
+# Conditions aux limites sur une grille non contiguë
+# ===============================
+def test_init_conditions_non_contigu():
+    g = Geometrie3D(tube(4, scale=3), profondeur_mm=3.0, largeur_mm=2.0)
+    reference = g.init_conditions(np.zeros(g.shape))
+
+    # Même forme, mais vue transposée (ordre Fortran) : pas contiguë en C
+    V = np.zeros(g.shape[::-1]).T
+    assert not V.flags.c_contiguous
+    assert g.init_conditions(V) is V
+    assert np.array_equal(V, reference)
+    assert np.count_nonzero(V) > 0